@@ -0,0 +1,192 @@
+##########
+## GLOBALS
+##########
+
+
+import json
+import re
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Lock
+from urllib.parse import urlparse, parse_qs
+
+try:
+    from .rebound import (CACHE_PORT, CACHE_MAX_ENTRIES, CACHE_SEARCH_TTL, CACHE_QUESTION_TTL, CACHE_CAPTCHA_STATUS,
+                          FIRST_PAGE_SIZE, GREEN, END, SITES, get_site, normalize_query, normalize_url,
+                          fetch_search_page, fetch_question_and_answers)
+except ImportError: # Not imported as part of the package (e.g. by the tests)
+    from rebound import (CACHE_PORT, CACHE_MAX_ENTRIES, CACHE_SEARCH_TTL, CACHE_QUESTION_TTL, CACHE_CAPTCHA_STATUS,
+                         FIRST_PAGE_SIZE, GREEN, END, SITES, get_site, normalize_query, normalize_url,
+                         fetch_search_page, fetch_question_and_answers)
+
+UPSTREAM_ERROR_STATUS = 502
+SITE_NAME = re.compile(r"^[a-z0-9-]+$") # Anything else could point get_site() at another host
+SITE_HOSTS = set(urlparse(site_url).hostname for site_url in SITES.values())
+
+
+##########
+## STORAGE
+##########
+
+
+class CacheStore(object):
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        """Compressed, pre-parsed responses keyed by normalized query/URL. Misses
+        for a key that's already being fetched wait for that fetch instead of
+        making their own."""
+        self.upstream_fetches = 0
+        self._entries = OrderedDict() # Key -> (expiry time, compressed JSON), least recently used first
+        self._in_flight = {} # Key -> [Event, (status, compressed JSON)]
+        self._lock = Lock()
+        self._max_entries = max_entries
+
+
+    def get(self, key, fetch, ttl):
+        """Returns (status, compressed JSON) for a key, calling fetch() on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                return 200, entry[1]
+
+            flight = self._in_flight.get(key)
+            if flight is not None: # Someone's already fetching it
+                leader = False
+            else:
+                leader = True
+                flight = self._in_flight[key] = [Event(), (UPSTREAM_ERROR_STATUS, None)]
+                self.upstream_fetches += 1
+
+        if not leader:
+            flight[0].wait()
+            return flight[1]
+
+        try:
+            data = fetch()
+            if data is None:
+                flight[1] = (CACHE_CAPTCHA_STATUS, None) # Not cached, the next request retries
+            else:
+                flight[1] = (200, zlib.compress(json.dumps(data).encode("utf-8")))
+        except Exception: # Upstream is down or its markup changed
+            pass
+        finally:
+            with self._lock:
+                if flight[1][0] == 200:
+                    self._entries[key] = (time.time() + ttl, flight[1][1])
+                    while len(self._entries) > self._max_entries:
+                        self._entries.popitem(last=False)
+                del self._in_flight[key]
+            flight[0].set()
+
+        return flight[1]
+
+
+#########
+## SERVER
+#########
+
+
+## Helper Functions ##
+
+
+def get_allowed_site(name):
+    """Returns the site for a requested name, if it's a Stack Exchange site.
+    Raises ValueError otherwise."""
+    name = name.strip().lower()
+    if name not in SITES and not SITE_NAME.match(name): # Unknown names become <name>.stackexchange.com
+        raise ValueError("Not a Stack Exchange site: %r" % name)
+
+    return get_site(name)
+
+
+def get_allowed_url(url):
+    """Returns a requested question URL if it's on a Stack Exchange site. Raises
+    ValueError otherwise, so the cache can't be used to reach other hosts."""
+    parsed = urlparse(url)
+    host = parsed.hostname or ''
+    if parsed.scheme != "https" or parsed.port is not None or parsed.username is not None or not parsed.path.startswith("/questions/") \
+            or not (host in SITE_HOSTS or re.match(r"^[a-z0-9-]+\.stackexchange\.com$", host)):
+        raise ValueError("Not a Stack Exchange question: %r" % url)
+
+    return url
+
+
+## Main ##
+
+
+class CacheHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        store, server = self.server.store, self.server
+
+        try:
+            if url.path == "/search":
+                site, query = get_allowed_site(params["site"]), normalize_query(params["q"])
+                page, pagesize = int(params.get("page", 1)), int(params.get("pagesize", FIRST_PAGE_SIZE))
+                key = "search %s %d %d %s" % (site[0], page, pagesize, query)
+                status, body = store.get(key, lambda: server.fetch_search(site, query, page, pagesize), CACHE_SEARCH_TTL)
+            elif url.path == "/question":
+                question_url = get_allowed_url(params["url"])
+                key = "question " + normalize_url(question_url)
+                status, body = store.get(key, lambda: server.fetch_question(question_url, exit_on_error=False), CACHE_QUESTION_TTL)
+            else:
+                status, body = 404, None
+        except (KeyError, ValueError): # Missing or invalid parameters
+            status, body = 400, None
+
+        self._respond(status, body)
+
+
+    def _respond(self, status, body):
+        self.send_response(status)
+        if body is not None:
+            if "deflate" in self.headers.get("Accept-Encoding", ''): # Send it as stored
+                self.send_header("Content-Encoding", "deflate")
+            else:
+                body = zlib.decompress(body)
+            self.send_header("Content-Type", "application/json")
+        else:
+            body = b''
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CacheServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fetch_search=fetch_search_page, fetch_question=fetch_question_and_answers):
+        """Shared cache service that rebound clients ask (via REBOUND_CACHE_URL)
+        before going to Stack Overflow themselves."""
+        ThreadingHTTPServer.__init__(self, address, CacheHandler)
+        self.store = CacheStore()
+        self.fetch_search, self.fetch_question = fetch_search, fetch_question
+
+
+#######
+## MAIN
+#######
+
+
+def serve(port=CACHE_PORT):
+    server = CacheServer(('', port))
+    print("%sServing the Rebound cache on port %d. Point clients at it with REBOUND_CACHE_URL=http://<host>:%d%s" % (GREEN, port, port, END))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else CACHE_PORT)
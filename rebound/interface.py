@@ -0,0 +1,883 @@
+##########
+## GLOBALS
+##########
+
+
+import urwid
+import os
+import requests
+import webbrowser
+import time
+from bisect import bisect_left
+from queue import Queue
+from threading import Thread
+from urwid.util import calc_width
+from urwid.widget import (BOX, FLOW, FIXED)
+
+try:
+    from .rebound import (FIRST_PAGE_SIZE, PAGE_SIZE, PAGINATION_THRESHOLD, TOP_ANSWERS, get_sites, search_stackoverflow,
+                          get_question_and_answers, get_more_answers, rank_search_results)
+except ImportError: # Not imported as part of the package (e.g. by the tests)
+    from rebound import (FIRST_PAGE_SIZE, PAGE_SIZE, PAGINATION_THRESHOLD, TOP_ANSWERS, get_sites, search_stackoverflow,
+                         get_question_and_answers, get_more_answers, rank_search_results)
+
+# Scroll actions
+SCROLL_LINE_UP = "line up"
+SCROLL_LINE_DOWN = "line down"
+SCROLL_PAGE_UP = "page up"
+SCROLL_PAGE_DOWN = "page down"
+SCROLL_TO_TOP = "to top"
+SCROLL_TO_END = "to end"
+
+# Scrollbar positions
+SCROLLBAR_LEFT = "left"
+SCROLLBAR_RIGHT = "right"
+
+SCROLL_FRAME_INTERVAL = 1 / 30 # Seconds between scroll updates from the mouse (i.e. at most 30 redraws per second)
+
+
+############
+## INTERFACE
+############
+
+
+## Helper Classes ##
+
+
+class Scrollable(urwid.WidgetDecoration):
+    # TODO: Fix scrolling behavior (works with up/down keys, not with cursor)
+
+    signals = ["near end"] # Emitted while the end is less than a screen away
+
+    def sizing(self):
+        return frozenset([BOX,])
+
+
+    def selectable(self):
+        return True
+
+
+    def __init__(self, widget):
+        """Box widget (wrapper) that makes a fixed or flow widget vertically scrollable."""
+        self._trim_top = 0
+        self._scroll_action = None
+        self._forward_keypress = None
+        self._old_cursor_coords = None
+        self._rows_max_cached = 0
+        self._rows_max_displayable = 0
+
+        # In-page search
+        self._last_canvas = None # Last rendered canvas of original_widget
+        self._text_rows = None # (canvas, rows as text, lowercase rows) index, rebuilt when the canvas changes
+        self._search_query = ''
+        self._search_matches = [] # (row, column) of each match, in order
+        self._search_current = None
+        self.__super.__init__(widget)
+
+
+    def render(self, size, focus=False):
+        maxcol, maxrow = size
+
+        # Render complete original widget
+        ow = self._original_widget
+        ow_size = self._get_original_widget_size(size)
+        self._last_canvas = ow.render(ow_size, focus)
+        if self._search_query and self._text_rows[0] is not self._last_canvas: # Resized or changed, matches moved
+            self._refresh_search()
+        canv = urwid.CompositeCanvas(self._last_canvas)
+        canv_cols, canv_rows = canv.cols(), canv.rows()
+
+        if canv_cols <= maxcol:
+            pad_width = maxcol - canv_cols
+            if pad_width > 0: # Canvas is narrower than available horizontal space
+                canv.pad_trim_left_right(0, pad_width)
+
+        if canv_rows <= maxrow:
+            fill_height = maxrow - canv_rows
+            if fill_height > 0: # Canvas is lower than available vertical space
+                canv.pad_trim_top_bottom(0, fill_height)
+        self._rows_max_displayable = maxrow
+        if canv_cols <= maxcol and canv_rows <= maxrow: # Canvas is small enough to fit without trimming
+            self._highlight_matches(canv, 0, maxcol, maxrow)
+            self._emit("near end")
+            return canv
+
+        self._adjust_trim_top(canv, size)
+
+        # Trim canvas if necessary
+        trim_top = self._trim_top
+        trim_end = canv_rows - maxrow - trim_top
+        trim_right = canv_cols - maxcol
+        if trim_top > 0:
+            canv.trim(trim_top)
+        if trim_end > 0:
+            canv.trim_end(trim_end)
+        if trim_right > 0:
+            canv.pad_trim_left_right(0, -trim_right)
+        if trim_end < maxrow:
+            self._emit("near end")
+
+        self._highlight_matches(canv, trim_top, maxcol, maxrow)
+
+        # Disable cursor display if cursor is outside of visible canvas parts
+        if canv.cursor is not None:
+            curscol, cursrow = canv.cursor
+            if cursrow >= maxrow or cursrow < 0:
+                canv.cursor = None
+
+        # Let keypress() know if original_widget should get keys
+        self._forward_keypress = bool(canv.cursor)
+
+        return canv
+
+
+    def keypress(self, size, key):
+        if self._forward_keypress:
+            ow = self._original_widget
+            ow_size = self._get_original_widget_size(size)
+
+            # Remember previous cursor position if possible
+            if hasattr(ow, "get_cursor_coords"):
+                self._old_cursor_coords = ow.get_cursor_coords(ow_size)
+
+            key = ow.keypress(ow_size, key)
+            if key is None:
+                return None
+
+        # Handle up/down, page up/down, etc
+        command_map = self._command_map
+        if command_map[key] == urwid.CURSOR_UP:
+            self._scroll_action = SCROLL_LINE_UP
+        elif command_map[key] == urwid.CURSOR_DOWN:
+            self._scroll_action = SCROLL_LINE_DOWN
+        elif command_map[key] == urwid.CURSOR_PAGE_UP:
+            self._scroll_action = SCROLL_PAGE_UP
+        elif command_map[key] == urwid.CURSOR_PAGE_DOWN:
+            self._scroll_action = SCROLL_PAGE_DOWN
+        elif command_map[key] == urwid.CURSOR_MAX_LEFT: # "home"
+            self._scroll_action = SCROLL_TO_TOP
+        elif command_map[key] == urwid.CURSOR_MAX_RIGHT: # "end"
+            self._scroll_action = SCROLL_TO_END
+        else:
+            return key
+
+        self._invalidate()
+
+
+    def mouse_event(self, size, event, button, col, row, focus):
+        ow = self._original_widget
+        if hasattr(ow, "mouse_event") and ow.selectable(): # Skips hit-testing content there's nothing to click in
+            ow_size = self._get_original_widget_size(size)
+            row += self._trim_top
+            return ow.mouse_event(ow_size, event, button, col, row, focus)
+        else:
+            return False
+
+
+    def _adjust_trim_top(self, canv, size):
+        """Adjust self._trim_top according to self._scroll_action"""
+        action = self._scroll_action
+        self._scroll_action = None
+
+        maxcol, maxrow = size
+        trim_top = self._trim_top
+        canv_rows = canv.rows()
+
+        if trim_top < 0:
+            # Negative trim_top values use bottom of canvas as reference
+            trim_top = canv_rows - maxrow + trim_top + 1
+
+        if canv_rows <= maxrow:
+            self._trim_top = 0  # Reset scroll position
+            return
+
+        def ensure_bounds(new_trim_top):
+            return max(0, min(canv_rows - maxrow, new_trim_top))
+
+        if action == SCROLL_LINE_UP:
+            self._trim_top = ensure_bounds(trim_top - 1)
+        elif action == SCROLL_LINE_DOWN:
+            self._trim_top = ensure_bounds(trim_top + 1)
+        elif action == SCROLL_PAGE_UP:
+            self._trim_top = ensure_bounds(trim_top - maxrow+1)
+        elif action == SCROLL_PAGE_DOWN:
+            self._trim_top = ensure_bounds(trim_top + maxrow-1)
+        elif action == SCROLL_TO_TOP:
+            self._trim_top = 0
+        elif action == SCROLL_TO_END:
+            self._trim_top = canv_rows - maxrow
+        else:
+            self._trim_top = ensure_bounds(trim_top)
+
+        if self._old_cursor_coords is not None and self._old_cursor_coords != canv.cursor:
+            self._old_cursor_coords = None
+            curscol, cursrow = canv.cursor
+            if cursrow < self._trim_top:
+                self._trim_top = cursrow
+            elif cursrow >= self._trim_top + maxrow:
+                self._trim_top = max(0, cursrow - maxrow + 1)
+
+
+    def _get_original_widget_size(self, size):
+        ow = self._original_widget
+        sizing = ow.sizing()
+        if FIXED in sizing:
+            return ()
+        elif FLOW in sizing:
+            return (size[0],)
+
+
+    def get_scrollpos(self, size=None, focus=False):
+        return self._trim_top
+
+
+    def set_scrollpos(self, position):
+        self._trim_top = int(position)
+        self._invalidate()
+
+
+    def rows_max(self, size=None, focus=False):
+        if size is not None:
+            ow = self._original_widget
+            ow_size = self._get_original_widget_size(size)
+            sizing = ow.sizing()
+            canv = urwid.CanvasCache.fetch(ow, ow.__class__, ow_size, focus)
+            if canv is not None: # Already rendered at this size and unchanged since
+                self._rows_max_cached = canv.rows()
+            elif FIXED in sizing:
+                self._rows_max_cached = ow.pack(ow_size, focus)[1]
+            elif FLOW in sizing:
+                self._rows_max_cached = ow.rows(ow_size, focus)
+            else:
+                raise RuntimeError("Not a flow/box widget: %r" % self._original_widget)
+        return self._rows_max_cached
+
+    def search(self, query):
+        """Highlights every (case-insensitive) occurrence of query and jumps to the
+        first one from the current position on. Returns the number of matches."""
+        query = query.lower()
+        indexed_canvas = self._text_rows[0] if self._text_rows else None
+        canvas, text_rows, lower_rows = self._get_text_rows()
+
+        if self._search_query and query.startswith(self._search_query) and indexed_canvas is canvas:
+            candidate_rows = sorted(set(row for row, col in self._search_matches)) # Narrowing down, only recheck matching rows
+        else:
+            candidate_rows = range(len(lower_rows))
+
+        self._search_query = query
+        self._search_matches = self._find_matches(query, lower_rows, candidate_rows)
+
+        if self._search_matches:
+            position = bisect_left(self._search_matches, (self._trim_top, 0))
+            self._search_current = position % len(self._search_matches)
+            self._jump_to_match()
+        else:
+            self._search_current = None
+            self._invalidate()
+
+        return len(self._search_matches)
+
+
+    def search_next(self, step=1):
+        """Jumps to the next (or, with step=-1, previous) match."""
+        if self._search_matches:
+            self._search_current = (self._search_current + step) % len(self._search_matches)
+            self._jump_to_match()
+
+
+    def clear_search(self):
+        self._search_query, self._search_matches, self._search_current = '', [], None
+        self._invalidate()
+
+
+    def _find_matches(self, query, lower_rows, candidate_rows):
+        matches = []
+        if query:
+            for row in candidate_rows:
+                col = lower_rows[row].find(query)
+                while col != -1:
+                    matches.append((row, col))
+                    col = lower_rows[row].find(query, col + 1)
+
+        return matches
+
+
+    def _refresh_search(self):
+        """Finds the current query again in a new canvas, without scrolling."""
+        canvas, text_rows, lower_rows = self._get_text_rows()
+        self._search_matches = self._find_matches(self._search_query, lower_rows, range(len(lower_rows)))
+        if self._search_matches:
+            self._search_current = bisect_left(self._search_matches, (self._trim_top, 0)) % len(self._search_matches)
+        else:
+            self._search_current = None
+
+
+    def _get_text_rows(self):
+        """Returns the rendered text of original_widget, one string per row. Only
+        rebuilt when the canvas changes (i.e. new width or content)."""
+        canvas = self._last_canvas
+        if canvas is None:
+            return None, [], []
+
+        if self._text_rows is None or self._text_rows[0] is not canvas:
+            text_rows = [row.decode("utf-8", "replace") for row in canvas.text]
+            self._text_rows = (canvas, text_rows, [row.lower() for row in text_rows])
+
+        return self._text_rows
+
+
+    def _jump_to_match(self):
+        row, col = self._search_matches[self._search_current]
+        if not self._trim_top <= row < self._trim_top + self._rows_max_displayable: # Not visible
+            self.set_scrollpos(max(0, row - self._rows_max_displayable // 3))
+        else:
+            self._invalidate()
+
+
+    def _highlight_matches(self, canv, trim_top, maxcol, maxrow):
+        """Overlays the visible matches onto the (already trimmed) canvas."""
+        if not self._search_matches:
+            return
+
+        _, text_rows, _ = self._text_rows
+        first = bisect_left(self._search_matches, (trim_top, 0))
+        last = bisect_left(self._search_matches, (trim_top + maxrow, 0))
+        for i in range(first, last):
+            row, col = self._search_matches[i]
+            text = text_rows[row][col:col + len(self._search_query)]
+            screen_col = calc_width(text_rows[row], 0, col) # Matches are found by character, wide ones take two columns
+            while text and screen_col + calc_width(text, 0, len(text)) > maxcol:
+                text = text[:-1]
+            if not text:
+                continue
+
+            attr = "search current" if i == self._search_current else "search match"
+            encoded = text.encode("utf-8")
+            width = calc_width(text, 0, len(text))
+            match = urwid.CompositeCanvas(urwid.TextCanvas([encoded], [[(attr, len(encoded))]], maxcol=width))
+            canv.overlay(match, screen_col, row - trim_top)
+
+
+    @property
+    def scroll_ratio(self):
+        return self._rows_max_cached / self._rows_max_displayable
+
+class ScrollBar(urwid.WidgetDecoration):
+    # TODO: Change scrollbar size and color(?)
+
+    def sizing(self):
+        return frozenset((BOX,))
+
+
+    def selectable(self):
+        return True
+
+
+    def __init__(self, widget, thumb_char=u'\u2588', trough_char=' ',
+                 side=SCROLLBAR_RIGHT, width=1, main_loop=None):
+        """Box widget that adds a scrollbar to `widget`. With a main_loop, mouse
+        scrolling is applied at most once every SCROLL_FRAME_INTERVAL."""
+        self.__super.__init__(widget)
+        self._thumb_char = thumb_char
+        self._trough_char = trough_char
+        self.scrollbar_side = side
+        self.scrollbar_width = max(1, width)
+        self._original_widget_size = (0, 0)
+        self._dragging = False
+
+        # Coalesced mouse scrolling
+        self._main_loop = main_loop
+        self._scroll_target = None # Position to scroll to (e.g. from dragging), None for the current one
+        self._scroll_delta = 0 # Wheel ticks on top of that
+        self._scroll_alarm = None
+        self._last_scroll = 0
+
+
+    def render(self, size, focus=False):
+        maxcol, maxrow = size
+
+        ow = self._original_widget
+        ow_base = self.scrolling_base_widget
+        sb_width = self._scrollbar_width
+        ow_size = (maxcol-sb_width, maxrow)
+        ow_rows_max = ow_base.rows_max(ow_size, focus) # Usually cached from the last render
+        if ow_rows_max <= maxrow: # Canvas fits without scrolling - no scrollbar needed
+            self._original_widget_size = size
+            return ow.render(size, focus)
+
+        self._original_widget_size = ow_size
+        ow_canv = ow.render(ow_size, focus)
+
+        pos = ow_base.get_scrollpos(ow_size, focus)
+        posmax = ow_rows_max - maxrow
+
+        # Thumb shrinks/grows according to the ratio of
+        # <number of visible lines> / <number of total lines>
+        thumb_weight = min(1, maxrow / max(1, ow_rows_max))
+        thumb_height = max(1, round(thumb_weight * maxrow))
+
+        # Thumb may only touch top/bottom if the first/last row is visible
+        top_weight = float(pos) / max(1, posmax)
+        top_height = int((maxrow-thumb_height) * top_weight)
+        if top_height == 0 and top_weight > 0:
+            top_height = 1
+
+        # Bottom part is remaining space
+        bottom_height = maxrow - thumb_height - top_height
+        assert thumb_height + top_height + bottom_height == maxrow
+
+        # Create scrollbar canvas
+        top = urwid.SolidCanvas(self._trough_char, sb_width, top_height)
+        thumb = urwid.SolidCanvas(self._thumb_char, sb_width, thumb_height)
+        bottom = urwid.SolidCanvas(self._trough_char, sb_width, bottom_height)
+        sb_canv = urwid.CanvasCombine([
+            (top, None, False),
+            (thumb, None, False),
+            (bottom, None, False),
+        ])
+
+        combinelist = [(ow_canv, None, True, ow_size[0]), (sb_canv, None, False, sb_width)]
+        if self._scrollbar_side != SCROLLBAR_LEFT:
+            return urwid.CanvasJoin(combinelist)
+        else:
+            return urwid.CanvasJoin(reversed(combinelist))
+
+
+    @property
+    def scrollbar_width(self):
+        return max(1, self._scrollbar_width)
+
+
+    @scrollbar_width.setter
+    def scrollbar_width(self, width):
+        self._scrollbar_width = max(1, int(width))
+        self._invalidate()
+
+
+    @property
+    def scrollbar_side(self):
+        return self._scrollbar_side
+
+
+    @scrollbar_side.setter
+    def scrollbar_side(self, side):
+        if side not in (SCROLLBAR_LEFT, SCROLLBAR_RIGHT):
+            raise ValueError("scrollbar_side must be 'left' or 'right', not %r" % side)
+        self._scrollbar_side = side
+        self._invalidate()
+
+
+    @property
+    def scrolling_base_widget(self):
+        """Nearest `base_widget` that is compatible with the scrolling API."""
+        def orig_iter(w):
+            while hasattr(w, "original_widget"):
+                w = w.original_widget
+                yield w
+            yield w
+
+        def is_scrolling_widget(w):
+            return hasattr(w, "get_scrollpos") and hasattr(w, "rows_max")
+
+        for w in orig_iter(self):
+            if is_scrolling_widget(w):
+                return w
+
+    @property
+    def scrollbar_column(self):
+        if self.scrollbar_side == SCROLLBAR_LEFT:
+            return 0
+        if self.scrollbar_side == SCROLLBAR_RIGHT:
+            return self._original_widget_size[0]
+
+    def keypress(self, size, key):
+        return self._original_widget.keypress(self._original_widget_size, key)
+
+
+    def mouse_event(self, size, event, button, col, row, focus):
+        ow = self._original_widget
+        ow_size = self._original_widget_size
+        handled = False
+        if hasattr(ow, "mouse_event"):
+            handled = ow.mouse_event(ow_size, event, button, col, row, focus)
+
+        if not handled and hasattr(ow, "set_scrollpos"):
+            if button == 4: # Scroll wheel up
+                if self._get_pending_scrollpos() > 0:
+                    self._queue_scroll(delta=-1)
+                    return True
+            elif button == 5: # Scroll wheel down
+                self._queue_scroll(delta=1)
+                return True
+            elif col == self.scrollbar_column:
+                self._queue_scroll(target=int(row*ow.scroll_ratio))
+                if event == "mouse press":
+                    self._dragging = True
+                elif event == "mouse release":
+                    self._dragging = False
+            elif self._dragging:
+                self._queue_scroll(target=int(row*ow.scroll_ratio))
+                if event == "mouse release":
+                    self._dragging = False
+
+
+
+        return False
+
+
+    def _get_pending_scrollpos(self):
+        """Position the original widget will be at once queued scrolling is applied."""
+        if self._scroll_target is not None:
+            return self._scroll_target + self._scroll_delta
+        else:
+            return self._original_widget.get_scrollpos(self._original_widget_size) + self._scroll_delta
+
+
+    def _queue_scroll(self, delta=0, target=None):
+        """Collects mouse scrolling so a burst of events turns into one position
+        update (and one redraw) per frame."""
+        if target is not None: # Dragging overrides earlier input
+            self._scroll_target, self._scroll_delta = target, 0
+        else:
+            self._scroll_delta += delta
+
+        wait = self._last_scroll + SCROLL_FRAME_INTERVAL - time.monotonic()
+        if self._main_loop is None or (wait <= 0 and self._scroll_alarm is None):
+            self._apply_scroll()
+        elif self._scroll_alarm is None:
+            self._scroll_alarm = self._main_loop.set_alarm_in(wait, self._apply_scroll)
+
+
+    def _apply_scroll(self, main_loop=None, user_data=None):
+        position = self._get_pending_scrollpos()
+        self._scroll_target, self._scroll_delta = None, 0
+        self._scroll_alarm, self._last_scroll = None, time.monotonic()
+        self._original_widget.set_scrollpos(max(0, position))
+
+
+class SearchGroup(object):
+    def __init__(self, query, search_results):
+        """Search results for one query, along with its pagination state."""
+        self.query, self.search_results = query, search_results
+        self.seen_urls = set(result["URL"] for result in search_results)
+        self.fetched_per_site = FIRST_PAGE_SIZE # Each site pages on its own, so the next page is picked from this
+        self.fetching = False
+        self.exhausted = len(search_results) < FIRST_PAGE_SIZE
+
+
+class SelectableText(urwid.Text):
+    def selectable(self):
+        return True
+
+
+    def keypress(self, size, key):
+        return key
+
+
+## Helper Functions ##
+
+
+def get_next_page(offset):
+    """Returns the (page, pagesize) that starts right after the first `offset`
+    results. Pages are PAGE_SIZE long once that lines up with what's been fetched."""
+    pagesize = PAGE_SIZE if offset % PAGE_SIZE == 0 else FIRST_PAGE_SIZE
+    return (offset // pagesize + 1, pagesize)
+
+
+def interleave(a, b):
+    result = []
+    while a and b:
+        result.append(a.pop(0))
+        result.append(b.pop(0))
+
+    result.extend(a)
+    result.extend(b)
+
+    return result
+
+
+## Main ##
+
+
+class App(object):
+    def __init__(self, search_groups, sites=None, error_traces=None):
+        """Takes a list of (query, search_results) pairs. Results are grouped under
+        their query when there's more than one. error_traces maps each query to
+        the (stack trace, error message) its later pages are ranked against."""
+        self.groups = [SearchGroup(query, search_results) for query, search_results in search_groups]
+        self.viewing_answers = False
+        self.sites = sites or get_sites()
+        self.error_traces = error_traces or {}
+        self._header_rows = 1 if len(self.groups) > 1 else 0
+        self._viewing_url, self._scrollable = None, None
+        self._searching = False
+        self._pending_calls = Queue()
+        self.palette = [
+            ("title", "light cyan,bold", "default", "standout"),
+            ("stats", "light green", "default", "standout"),
+            ("menu", "black", "light cyan", "standout"),
+            ("reveal focus", "black", "light cyan", "standout"),
+            ("reveal viewed focus", "yellow, bold", "light cyan", "standout"),
+            ("no answers", "light red", "default", "standout"),
+            ("code", "brown", "default", "standout"),
+            ("viewed", "yellow", "default", "standout"),
+            ("error", "light red,bold", "default", "standout"),
+            ("search match", "black", "yellow", "standout"),
+            ("search current", "black", "light green", "standout")
+        ]
+        self.menu = urwid.Text([
+            u'\n',
+            ("menu", u" ENTER "), ("light gray", u" View answers "),
+            ("menu", u" B "), ("light gray", u" Open browser "),
+            ("menu", u" Q "), ("light gray", u" Quit"),
+        ])
+
+        results = []
+        for i, group in enumerate(self.groups):
+            if self._header_rows:
+                results.append(urwid.Text([u'\n' if i else u'', ("error", u"%s" % group.query)]))
+            results.extend(self._stylize_results(group.search_results))
+        self.content = urwid.SimpleListWalker(results)
+        self.content_container = urwid.ListBox(self.content)
+        layout = urwid.Frame(body=self.content_container, footer=self.menu)
+
+        self.main_loop = urwid.MainLoop(layout, self.palette, unhandled_input=self._handle_input)
+        self.original_widget = self.main_loop.widget
+
+        self._wake_pipe = self.main_loop.watch_pipe(self._run_pending_calls)
+        urwid.connect_signal(self.content, "modified", self._check_pagination)
+
+        self.main_loop.run()
+
+
+    def _handle_input(self, input):
+        if self._searching: # Typing goes to the search prompt
+            if input == "enter":
+                self._finish_search()
+            elif input == "esc":
+                self._finish_search(cancel=True)
+            return
+
+        if input == "enter" or (input[0]=='meta mouse press' and input[1]==1): # View answers   Either press Enter or "ALT + Left Click"
+            url = self._get_selected_link()
+
+            if url != None:
+                self.viewing_answers, self._viewing_url = True, url
+                question = get_question_and_answers(url, on_update=lambda question: self._call_soon(self._update_question, url, question))
+
+                # highlight the selected answer
+                _, idx = self.content_container.get_focus()
+                txt = self.content[idx].original_widget.text
+                self.content[idx] = urwid.AttrMap(SelectableText(txt), 'viewed', 'reveal viewed focus')
+
+                self._show_question(question)
+        elif input in ('b', 'B') or (input[0]=='ctrl mouse press' and input[1]==1): # Open link     Either press (B or b) or "CTRL + Left Click"
+            url = self._get_selected_link()
+
+            if url != None:
+                webbrowser.open(url)
+        elif input == "esc": # Close window
+            if self.viewing_answers:
+                self.main_loop.widget = self.original_widget
+                self.viewing_answers = False
+            else:
+                raise urwid.ExitMainLoop()
+        elif input in ('q', 'Q'): # Quit
+            raise urwid.ExitMainLoop()
+        elif self.viewing_answers and input == '/': # Search the answers
+            self._start_search()
+        elif self.viewing_answers and input in ('n', 'N'): # Next/previous match
+            self._scrollable.search_next(1 if input == 'n' else -1)
+
+
+    def _show_question(self, question, scrollpos=0):
+        question_title, question_desc, question_stats, answers = question
+        answers = [urwid.Text(answer) for answer in answers]
+        if len(answers) == 0:
+            answers.append(urwid.Text(("no answers", u"\nNo answers for this question.")))
+
+        self._pile = urwid.Pile(self._stylize_question(question_title, question_desc, question_stats) + [urwid.Divider('*')] +
+        interleave(answers, [urwid.Divider('-')] * (len(answers) - 1)))
+        self._scrollable = Scrollable(urwid.Padding(self._pile, left=2, right=2))
+        self._scrollable.set_scrollpos(scrollpos)
+        urwid.connect_signal(self._scrollable, "near end", self._load_more_answers)
+
+        # Later answers load as the user scrolls toward the end
+        self._answer_count = len(question[3])
+        self._answers_fetching, self._answers_exhausted = False, len(question[3]) < TOP_ANSWERS
+        padding = ScrollBar(self._scrollable, main_loop=self.main_loop)
+        #filler = urwid.Filler(padding, valign="top")
+        linebox = urwid.LineBox(padding)
+
+        self._answers_menu = urwid.Text([
+            u'\n',
+            ("menu", u" ESC "), ("light gray", u" Go back "),
+            ("menu", u" / "), ("light gray", u" Search "),
+            ("menu", u" N "), ("light gray", u" Next match "),
+            ("menu", u" B "), ("light gray", u" Open browser "),
+            ("menu", u" Q "), ("light gray", u" Quit"),
+        ])
+
+        self._searching = False
+        self._answers_frame = urwid.Frame(body=urwid.Overlay(linebox, self.content_container, "center", ("relative", 60), "middle", 23), footer=self._answers_menu)
+        self.main_loop.widget = self._answers_frame
+
+
+    def _start_search(self):
+        prompt = urwid.Edit(u"\n/")
+        urwid.connect_signal(prompt, "change", lambda prompt, query: self._scrollable.search(query))
+        self._answers_frame.footer = prompt
+        self._answers_frame.focus_position = "footer"
+        self._searching = True
+
+
+    def _finish_search(self, cancel=False):
+        if cancel:
+            self._scrollable.clear_search()
+
+        self._answers_frame.footer = self._answers_menu
+        self._answers_frame.focus_position = "body"
+        self._searching = False
+
+
+    def _update_question(self, url, question):
+        """Redraws the open question if a newer version of it came in."""
+        if self.viewing_answers and self._viewing_url == url:
+            self._show_question(question, self._scrollable.get_scrollpos())
+
+
+    def _load_more_answers(self, scrollable):
+        if self._answers_fetching or self._answers_exhausted:
+            return
+
+        self._answers_fetching = True
+        thread = Thread(target=self._fetch_more_answers, args=(self._viewing_url, self._answer_count))
+        thread.daemon = True
+        thread.start()
+
+
+    def _fetch_more_answers(self, url, start):
+        """Runs in a background thread and hands the next answers to the main loop."""
+        try:
+            answers = get_more_answers(url, start)
+        except requests.exceptions.RequestException:
+            answers = []
+
+        self._call_soon(self._append_answers, url, start, answers)
+
+
+    def _append_answers(self, url, start, answers):
+        if url != self._viewing_url or start != self._answer_count: # Question was closed or redrawn
+            return
+
+        self._answers_fetching = False
+        if not answers:
+            self._answers_exhausted = True
+            return
+
+        for answer in answers:
+            self._pile.contents.append((urwid.Divider('-'), self._pile.options()))
+            self._pile.contents.append((urwid.Text(answer), self._pile.options()))
+        self._answer_count += len(answers)
+
+
+    def _call_soon(self, func, *args):
+        """Runs func(*args) on the main loop. Safe to call from background threads."""
+        self._pending_calls.put((func, args))
+        os.write(self._wake_pipe, b'\n') # Wakes up the main loop
+
+
+    def _run_pending_calls(self, data):
+        while not self._pending_calls.empty():
+            func, args = self._pending_calls.get()
+            func(*args)
+
+
+    def _check_pagination(self):
+        """Starts fetching the next page of a group when focus nears its last result."""
+        _, idx = self.content_container.get_focus()
+        if idx is None:
+            return
+
+        for group, group_end in zip(self.groups, self._group_ends()):
+            if idx < group_end:
+                if not (group.fetching or group.exhausted) and idx >= group_end - PAGINATION_THRESHOLD:
+                    group.fetching = True
+                    thread = Thread(target=self._fetch_next_page, args=(group,))
+                    thread.daemon = True
+                    thread.start()
+                return
+
+
+    def _group_ends(self):
+        """Returns the index after the last row of each group in the list."""
+        group_ends, end = [], 0
+        for group in self.groups:
+            end += self._header_rows + len(group.search_results)
+            group_ends.append(end)
+
+        return group_ends
+
+
+    def _fetch_next_page(self, group):
+        """Runs in a background thread and hands the fetched page to the main loop."""
+        page, pagesize = get_next_page(group.fetched_per_site)
+        try:
+            search_results, captcha = search_stackoverflow(group.query, page, pagesize, exit_on_error=False, sites=self.sites)
+        except requests.exceptions.RequestException:
+            search_results, captcha = None, True
+
+        self._call_soon(self._append_page, group, pagesize, None if captcha else search_results)
+
+
+    def _append_page(self, group, pagesize, search_results):
+        """Appends a fetched page to its group, skipping results that are already shown."""
+        group.fetching = False
+
+        if not search_results: # Captcha, network error or no more results
+            group.exhausted = True
+            return
+
+        group.fetched_per_site += pagesize
+        new_results = [result for result in search_results if result["URL"] not in group.seen_urls]
+        new_results = rank_search_results(new_results, *self.error_traces.get(group.query, (None, None)))
+        if len(search_results) < pagesize or not new_results: # Last page
+            group.exhausted = True
+
+        group_end = self._group_ends()[self.groups.index(group)]
+        group.seen_urls.update(result["URL"] for result in new_results)
+        group.search_results.extend(new_results)
+        self.content[group_end:group_end] = self._stylize_results(new_results)
+
+
+    def _get_selected_link(self):
+        focus_widget, idx = self.content_container.get_focus() # Gets selected item
+        title = focus_widget.base_widget.text
+
+        for group in self.groups:
+            for result in group.search_results:
+                if title == self._stylize_title(result): # Found selected title's search_result dict
+                    return result["URL"]
+
+
+    def _stylize_results(self, search_results):
+        return [urwid.AttrMap(SelectableText(self._stylize_title(result)), None, "reveal focus") for result in search_results] # TODO: Add a wrap='clip' attribute
+
+
+    def _stylize_title(self, search_result):
+        title = search_result["Title"]
+        if len(self.sites) > 1: # Tag the source site
+            title = "[%s] %s" % (search_result["Site"], title)
+
+        if search_result["Answers"] == 1:
+            return "%s (1 Answer)" % title
+        else:
+            return "%s (%s Answers)" % (title, search_result["Answers"])
+
+
+    def _stylize_question(self, title, desc, stats):
+        new_title = urwid.Text(("title", u"%s" % title))
+        new_desc = urwid.Text(desc)
+        new_stats = urwid.Text(("stats", u"%s\n" % stats))
+
+        return [new_title, new_desc, new_stats]
@@ -3,22 +3,103 @@
 ##########
 
 
-import urwid
 import re
 import sys
 import os
 from bs4 import BeautifulSoup
 import requests
 from queue import Queue
+from itertools import zip_longest
 from subprocess import PIPE, Popen
 from threading import Thread
-import webbrowser
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from collections import deque
+import json
 import time
-from urwid.widget import (BOX, FLOW, FIXED)
 import random
+import math
+import html
+import hashlib
+import shutil
+import importlib
+import socket
+from threading import Lock
+from urllib.parse import urlparse
 
 SO_URL = "https://stackoverflow.com"
 
+# Stack Exchange sites that can be searched (pick with REBOUND_SITES, e.g. "stackoverflow,serverfault")
+SITES = {
+    "stackoverflow": SO_URL,
+    "serverfault": "https://serverfault.com",
+    "superuser": "https://superuser.com",
+    "unix": "https://unix.stackexchange.com",
+    "askubuntu": "https://askubuntu.com"
+}
+DEFAULT_SITES = "stackoverflow"
+SEARCH_DEADLINE = 6 # Seconds to wait for the slowest site before showing what we have
+
+# Stack Exchange API backend (use it with REBOUND_BACKEND=api)
+SE_API_URL = os.environ.get("REBOUND_API_URL", "https://api.stackexchange.com/2.3")
+SE_API_FIELDS = [ # Only what the interface uses
+    ".items", ".has_more", ".backoff", ".quota_remaining", ".error_id", ".error_name", ".error_message",
+    "question.question_id", "question.title", "question.link", "question.answer_count", "question.tags",
+    "question.body", "question.score", "question.creation_date",
+    "answer.answer_id", "answer.question_id", "answer.body", "answer.score"
+]
+SE_API_ACTIVITY_FIELDS = [".items", ".error_id", ".error_name", ".error_message", "question.question_id", "question.last_activity_date"]
+SE_API_BATCH_SIZE = 100 # Most ids (and items) the API takes/returns per call
+SE_API_THROTTLED = 502 # error_id for throttle violations
+EXCERPT_LENGTH = 300
+# Answer loading
+TOP_ANSWERS = 5 # Answers parsed when a question is opened, the rest load while scrolling
+ANSWERS_PER_PAGE = 30 # Answers per page of a question (on the site and from the API)
+MAX_UNPARSED_QUESTIONS = 10 # Questions whose unparsed answers are kept around
+
+MAX_ERROR_SEARCHES = 10 # Most distinct errors from one run that get searched
+MAX_CONCURRENT_SEARCHES = 4 # Searches that run at the same time
+WARM_UP_TIMEOUT = 3 # Seconds the warm-up spends connecting to each host
+
+# Memoized runs and local question cache (opt-in with --memo)
+CACHE_DIR = os.environ.get("REBOUND_CACHE_DIR", os.path.join(os.path.expanduser('~'), ".cache", "rebound"))
+DETERMINISTIC_ERRORS = { # Errors that only depend on the source, i.e. rerunning gives the same result
+    "python3": r"^\s*(SyntaxError|IndentationError|TabError): .*\Z", # As the final line, without a traceback (see below)
+    "node": r"^\s*SyntaxError: .*\n\s+at .*(node:internal|internal/|vm\.js)", # Thrown by the compiler, not JSON.parse() or eval()
+    "ruby": r"^\s*\S+\.rb:\d+: syntax error", # Parser's location header, eval() errors start with "in `eval'"
+    "javac": r"^\s*\S+\.java:\d+: error: ",
+    "go run": r"\A# command-line-arguments$"
+}
+
+QUESTION_FRESH_FOR = 10 * 60 # Seconds before a cached question is revalidated
+
+# Shared cache service (see cache_server.py, point clients at it with REBOUND_CACHE_URL)
+CACHE_PORT = 8585
+CACHE_MAX_ENTRIES = 10000
+CACHE_SEARCH_TTL = 24 * 60 * 60 # Seconds
+CACHE_QUESTION_TTL = 60 * 60
+CACHE_CAPTCHA_STATUS = 503 # Upstream gave us a captcha page
+
+# Non-interactive output
+OUTPUT_FORMATS = ("text", "markdown", "json")
+MAX_PENDING_ANSWERS = 4 # Answer pages fetched ahead of what's been written
+
+# Stack trace re-ranking (BM25)
+BM25_K1 = 1.2
+BM25_B = 0.75
+EXCEPTION_WEIGHT = 3 # Exception types matter more than frame/module names
+MESSAGE_WEIGHT = 2 # Words from the error message itself matter more than the rest of its trace
+RANK_PRIOR_WEIGHT = 0.3 # How much of the original search order to keep
+TRACE_STOPWORDS = {
+    "traceback", "most", "recent", "call", "last", "file", "line", "in", "at", "from", "the", "of",
+    "to", "is", "not", "py", "js", "rb", "go", "java", "class", "module", "main", "lib", "usr",
+    "home", "users", "site", "packages", "node_modules", "src", "exit", "status", "native", "method"
+}
+
+# Search result pagination
+FIRST_PAGE_SIZE = 15 # Small first page so results show up quickly
+PAGE_SIZE = 30 # Size of each page fetched in the background
+PAGINATION_THRESHOLD = 5 # Fetch the next page when focus is this close to the end
+
 # ASCII color codes
 GREEN = '\033[92m'
 GRAY = '\033[90m'
@@ -29,18 +110,6 @@ END = '\033[0m'
 UNDERLINE = '\033[4m'
 BOLD = '\033[1m'
 
-# Scroll actions
-SCROLL_LINE_UP = "line up"
-SCROLL_LINE_DOWN = "line down"
-SCROLL_PAGE_UP = "page up"
-SCROLL_PAGE_DOWN = "page down"
-SCROLL_TO_TOP = "to top"
-SCROLL_TO_END = "to end"
-
-# Scrollbar positions
-SCROLLBAR_LEFT = "left"
-SCROLLBAR_RIGHT = "right"
-
 USER_AGENTS = [
     "Mozilla/5.0 (compatible; MSIE 6.0; Windows NT 5.1; SV1; AcooBrowser; .NET CLR 1.1.4322; .NET CLR 2.0.50727)",
     "Mozilla/5.0 (Windows; U; MSIE 9.0; Windows NT 9.0; en-US)",
@@ -132,6 +201,82 @@ def get_error_message(error, language):
         return None
 
 
+def get_error_messages(error, language):
+    """Returns every distinct error message in stderr (e.g. all javac errors),
+    in the order they were reported."""
+    if error == '' or error is None:
+        return []
+    elif language == "python3": # Chained exceptions
+        error_msgs = []
+        lines = [line.strip() for line in error.split('\n')]
+        for i, line in enumerate(lines):
+            if line.startswith("During handling of the above exception") or line.startswith("The above exception was the direct cause"):
+                previous = [l for l in lines[:i] if l]
+                if previous:
+                    error_msgs.append(previous[-1])
+        error_msg = get_error_message(error, language)
+        error_msgs = error_msgs + [error_msg] if error_msg != None else []
+    elif language == "javac":
+        error_msgs = [m.group(1) for m in re.finditer(r'.*?error:(.*)', error)]
+    elif language == "java":
+        error_msgs = []
+        for line in error.split('\n'):
+            m = re.search(r'.*(Exception|Error):(.*)', line)
+            if m and m.group(2):
+                error_msgs.append(m.group(2))
+                continue
+
+            m = re.search(r'Exception in thread ".*" (.*)', line)
+            if m and m.group(1):
+                error_msgs.append(m.group(1))
+    elif language == "go run":
+        error_msgs = [m.group(1) for m in re.finditer(r'\S+\.go:\d+(?::\d+)?: (.*)', error)]
+    else:
+        error_msgs = []
+
+    if not error_msgs: # Fall back to the single error message
+        error_msg = get_error_message(error, language)
+        error_msgs = [error_msg] if error_msg != None else []
+
+    distinct_msgs = []
+    for error_msg in error_msgs:
+        error_msg = ' '.join(error_msg.split())
+        if error_msg and error_msg not in distinct_msgs:
+            distinct_msgs.append(error_msg)
+
+    return distinct_msgs
+
+
+def get_error_traces(error, error_msgs, language):
+    """Returns the part of stderr that belongs to each error message: the
+    traceback before it for Python, otherwise the lines after it (javac's source
+    excerpt, Java's "at" frames, etc.) up to the next message."""
+    lines = error.split('\n')
+    normalized = [' '.join(line.split()) for line in lines]
+
+    positions, start = [], 0
+    for error_msg in error_msgs:
+        position = next((i for i in range(start, len(lines)) if error_msg in normalized[i]), None)
+        positions.append(position)
+        if position is not None:
+            start = position + 1
+
+    traces = []
+    for i, position in enumerate(positions):
+        if position is None: # Not found on a line of its own, fall back to all of stderr
+            traces.append(error)
+            continue
+
+        if language == "python3":
+            previous = max([p for p in positions[:i] if p is not None], default=-1)
+            traces.append('\n'.join(lines[previous + 1:position + 1]))
+        else:
+            following = min([p for p in positions[i + 1:] if p is not None], default=len(lines))
+            traces.append('\n'.join(lines[position:following]))
+
+    return traces
+
+
 #################
 ## FILE EXECUTION
 #################
@@ -148,18 +293,18 @@ def read(pipe, funcs):
     pipe.close()
 
 
-def write(get):
+def write(get, stream=None):
     """Pulls output from shared queue and prints to terminal."""
     for line in iter(get, None):
-        print(line)
+        print(line, file=stream or sys.stdout)
 
 
 ## Main ##
 
 
-def execute(command):
+def execute(command, echo=None):
     """Executes a given command and clones stdout/err to both variables and the
-    terminal (in real-time)."""
+    terminal (in real-time). The output is echoed to `echo` (stdout by default)."""
     process = Popen(
         command,
         cwd=None,
@@ -177,7 +322,7 @@ def execute(command):
     stdout_thread = Thread(target=read, args=(process.stdout, [pipe_queue.put, output.append]))
     stderr_thread = Thread(target=read, args=(process.stderr, [pipe_queue.put, errors.append]))
 
-    writer_thread = Thread(target=write, args=(pipe_queue.get,)) # Thread for printing items in the queue
+    writer_thread = Thread(target=write, args=(pipe_queue.get, echo)) # Thread for printing items in the queue
 
     # Spawns each thread
     for thread in (stdout_thread, stderr_thread, writer_thread):
@@ -190,6 +335,7 @@ def execute(command):
         thread.join()
 
     pipe_queue.put(None)
+    writer_thread.join() # Everything is echoed before results are printed
 
     output = ' '.join(output)
     errors = ' '.join(errors)
@@ -200,16 +346,114 @@ def execute(command):
         return (output, errors)
 
 
+#################
+## MEMOIZED RUNS
+#################
+
+
+## Helper Functions ##
+
+
+def get_interpreter_version(language):
+    """Identifies the installed interpreter/compiler by its path, size and
+    modification time, which is much cheaper than running `--version`."""
+    path = shutil.which(language.split()[0])
+    if path is None:
+        return ''
+
+    stat = os.stat(path)
+    return "%s:%d:%d" % (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def get_source_digest(language, file_path):
+    """Hashes the interpreter version, the arguments and the contents of the
+    target file(s) and their sibling source files (i.e. local imports)."""
+    digest = hashlib.sha256()
+    digest.update(get_interpreter_version(language).encode("utf-8"))
+    digest.update('\0'.join(file_path).encode("utf-8"))
+
+    paths = set()
+    for arg in file_path:
+        if language == "java": # Class name instead of a file
+            arg += ".class"
+        if os.path.isfile(arg):
+            directory, extension = os.path.dirname(os.path.abspath(arg)), os.path.splitext(arg)[1]
+            paths.update(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(extension))
+
+    for path in sorted(paths):
+        digest.update(path.encode("utf-8"))
+        with open(path, "rb") as file:
+            digest.update(hashlib.sha256(file.read()).digest())
+
+    return digest.hexdigest()
+
+
+def get_memo_path(language, file_path):
+    """Returns where the memo for a command is stored. There's one per command,
+    so a new run of a changed file replaces the old memo."""
+    command = [language, os.getcwd()] + [os.path.abspath(arg) if os.path.exists(arg) else arg for arg in file_path]
+    key = hashlib.sha256('\0'.join(command).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, "memo", key + ".json")
+
+
+def is_deterministic_error(error, language):
+    """Returns whether an error comes from compiling/parsing the source rather
+    than running it (e.g. a SyntaxError from parsing input data)."""
+    if language == "python3" and "Traceback (most recent call last)" in error: # Raised while running, e.g. by eval() or ast.parse()
+        return False
+
+    pattern = DETERMINISTIC_ERRORS.get(language)
+    return pattern is not None and re.search(pattern, error.strip(), re.MULTILINE) is not None
+
+
+## Main ##
+
+
+def load_memo(language, file_path):
+    """Returns the stored (error, search_groups) of a run, or None if there's
+    none or the source has changed since."""
+    try:
+        with open(get_memo_path(language, file_path), encoding="utf-8") as file:
+            memo = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if memo.get("digest") != get_source_digest(language, file_path):
+        return None
+
+    return memo["error"], [(query, search_results) for query, search_results in memo["search_groups"]]
+
+
+def save_memo(language, file_path, error, search_groups):
+    """Stores the error and search results of a run if the error is deterministic."""
+    if not is_deterministic_error(error, language):
+        return
+
+    memo_path = get_memo_path(language, file_path)
+    memo = {"digest": get_source_digest(language, file_path), "error": error, "search_groups": search_groups}
+    try:
+        os.makedirs(os.path.dirname(memo_path), exist_ok=True)
+        with open(memo_path + ".tmp", 'w', encoding="utf-8") as file:
+            json.dump(memo, file)
+        os.replace(memo_path + ".tmp", memo_path) # Readers never see a partial memo
+    except OSError:
+        pass # Memoizing is best-effort
+
+
 ###############
 ## WEB SCRAPING
 ###############
 
 
+_unparsed_answers = {} # Question URL -> (index of the first one, answer elements), see stash_answers
+
+
 ## Helper Functions ##
 
 
 def stylize_code(soup):
-    """Identifies and stylizes code in a question or answer."""
+    """Identifies and stylizes code in a question or answer. Returns urwid-style
+    text markup: plain strings and ("code", text) tuples."""
     # TODO: Handle blockquotes and markdown
     stylized_text = []
     code_blocks = [block.get_text() for block in soup.find_all("code")]
@@ -232,16 +476,45 @@ def stylize_code(soup):
                 newline = child.endswith('\n')
                 stylized_text.append(u"%s" % str(child))
 
-    if type(stylized_text[-2]) == tuple:
+    if len(stylized_text) > 1 and type(stylized_text[-2]) == tuple:
         # Remove newline from questions/answers that end with a code block
         if stylized_text[-2][1].endswith('\n'):
             stylized_text[-2] = ("code", stylized_text[-2][1][:-1])
 
-    return urwid.Text(stylized_text)
+    return stylized_text
+
 
+def get_site(name):
+    """Returns the (name, URL) pair of a Stack Exchange site."""
+    name = name.strip().lower()
+    return (name, SITES.get(name, "https://%s.stackexchange.com" % name))
 
-def get_search_results(soup):
+
+def get_sites():
+    """Returns the (name, URL) pairs of the Stack Exchange sites to search."""
+    return [get_site(name) for name in os.environ.get("REBOUND_SITES", DEFAULT_SITES).split(',') if name.strip()]
+
+
+def merge_search_results(results_by_site):
+    """Interleaves each site's results by rank and drops duplicates (same URL or
+    same title, i.e. cross-posted or migrated questions)."""
+    merged, seen = [], set()
+    for rank_results in zip_longest(*results_by_site):
+        for result in rank_results:
+            if result is None:
+                continue
+
+            keys = (result["URL"], result["Title"].lower())
+            if not seen.intersection(keys):
+                seen.update(keys)
+                merged.append(result)
+
+    return merged
+
+
+def get_search_results(soup, site=("stackoverflow", SO_URL)):
     """Returns a list of dictionaries containing each search result."""
+    site_name, site_url = site
     search_results = []
 
     for result in soup.find_all("div", class_="question-summary search-result"):
@@ -254,543 +527,850 @@ def get_search_results(soup):
         else: # No answers
             answer_count = 0
 
+        excerpt = result.find("div", class_="excerpt")
         search_results.append({
             "Title": title_container["title"],
-            #"Body": result.find_all("div", class_="excerpt")[0].text,
+            "Body": excerpt.get_text().strip() if excerpt else "",
+            "Tags": [tag.get_text() for tag in result.find_all("a", class_="post-tag")],
             #"Votes": int(result.find_all("span", class_="vote-count-post ")[0].find_all("strong")[0].text),
             "Answers": answer_count,
-            "URL": SO_URL + title_container["href"]
+            "URL": site_url + title_container["href"],
+            "Site": site_name
         })
 
     return search_results
 
 
-def souper(url):
-    """Turns a given URL into a BeautifulSoup object."""
+def submit_daemon(func, *args):
+    """Like ThreadPoolExecutor.submit(), but on a daemon thread, so a call that's
+    given up on (e.g. a slow site) doesn't hold up the process exiting."""
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    thread = Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return future
+
+
+_session = None # Shared by every request so connections (and their TLS setup) are reused
+_session_lock = Lock()
+
+
+def get_session():
+    """Returns the pooled HTTP session all of rebound's requests go through."""
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=len(SITES) + 2, pool_maxsize=MAX_CONCURRENT_SEARCHES)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+
+        return _session
+
+
+def get_page(url, headers=None, exit_on_error=True):
+    """Fetches a given URL with a random user agent. Returns None for a captcha page."""
 
     try:
-        html = requests.get(url, headers={"User-Agent": random.choice(USER_AGENTS)})
+        html = get_session().get(url, headers=dict(headers or {}, **{"User-Agent": random.choice(USER_AGENTS)}), timeout=SEARCH_DEADLINE)
     except requests.exceptions.RequestException:
-        sys.stdout.write("\n%s%s%s" % (RED, "Rebound was unable to fetch Stack Overflow results. "
-                                            "Please check that you are connected to the internet.\n", END))
+        if not exit_on_error: # Let the caller (i.e. a background thread) handle it
+            raise
+
+        print_status("Rebound was unable to fetch Stack Overflow results. "
+                     "Please check that you are connected to the internet.\n")
         sys.exit(1)
 
     if re.search("\.com/nocaptcha", html.url): # URL is a captcha page
         return None
+    else:
+        return html
+
+
+def souper(url, exit_on_error=True):
+    """Turns a given URL into a BeautifulSoup object."""
+    html = get_page(url, exit_on_error=exit_on_error)
+
+    if html == None: # Captcha page
+        return None
     else:
         return BeautifulSoup(html.text, "html.parser")
 
 
+def get_answers_url(url, page=1):
+    """Returns the URL of a page of a question's answers, sorted by votes."""
+    return "%s?page=%d&tab=votes" % (url.split('#', 1)[0].split('?', 1)[0], page)
+
+
+def parse_question(soup, url):
+    """Returns details about the question on a page and a list of its top
+    answers. The rest of the page's answers are kept unparsed for get_more_answers."""
+    question_title = soup.find_all('a', class_="question-hyperlink")[0].get_text()
+    question_stats = soup.find("div", attrs={"itemprop": "upvoteCount"}).get_text() # Vote count
+    question_stats += " Votes | Asked " + soup.find("time", attrs={"itemprop": "dateCreated"}).get_text() # Date created
+    posts = soup.find_all("div", class_="s-prose js-post-body")
+    question_desc = stylize_code(posts[0]) # TODO: Handle duplicates
+
+    answers = [stylize_code(answer) for answer in posts[1:TOP_ANSWERS + 1]]
+    if len(posts) > TOP_ANSWERS + 1:
+        stash_answers(url, TOP_ANSWERS, posts[TOP_ANSWERS + 1:])
+
+    return question_title, question_desc, question_stats, answers
+
+
+def stash_answers(url, start, answers):
+    """Keeps a question's unparsed answers (from the `start`th on) until they're needed."""
+    while len(_unparsed_answers) >= MAX_UNPARSED_QUESTIONS:
+        del _unparsed_answers[next(iter(_unparsed_answers))] # Oldest first
+
+    _unparsed_answers[normalize_url(url)] = (start, answers)
+
+
 ## Main ##
 
 
-def search_stackoverflow(query):
-    """Wrapper function for get_search_results."""
-    soup = souper(SO_URL + "/search?pagesize=50&q=%s" % query.replace(' ', '+'))
+def fetch_search_page(site, query, page=1, pagesize=FIRST_PAGE_SIZE):
+    """Fetches a single page of results from one site. Returns None for a captcha page."""
+    if get_backend() == "api":
+        return api_search_site(site, query, page, pagesize)
 
-    # TODO: Randomize the user agent
+    soup = souper(site[1] + "/search?page=%d&pagesize=%d&q=%s" % (page, pagesize, query.replace(' ', '+')), exit_on_error=False)
 
     if soup == None:
-        return (None, True)
+        return None
     else:
-        return (get_search_results(soup), False)
+        return get_search_results(soup, site)
+
+
+def search_site(site, query, page=1, pagesize=FIRST_PAGE_SIZE):
+    """Gets a single page of results from one site, from the shared cache if
+    there is one. Returns None for a captcha page."""
+    if get_cache_url():
+        try:
+            return cache_request("/search", {"site": site[0], "q": query, "page": page, "pagesize": pagesize})
+        except requests.exceptions.RequestException:
+            pass # Cache is down, fetch it ourselves
+
+    return fetch_search_page(site, query, page, pagesize)
+
+
+def search_stackoverflow(query, page=1, pagesize=FIRST_PAGE_SIZE, exit_on_error=True, sites=None):
+    """Searches every site at once and merges the results. Sites that haven't
+    answered within SEARCH_DEADLINE are left out."""
+    sites = sites or get_sites()
+
+    futures = [submit_daemon(search_site, site, query, page, pagesize) for site in sites]
+    wait(futures, timeout=SEARCH_DEADLINE) # Stragglers are left behind, even at exit
+
+    results_by_site, captcha, error = [], False, None
+    for future in futures:
+        if not future.done():
+            continue
+        elif future.exception() is not None:
+            error = future.exception()
+        elif future.result() is None:
+            captcha = True
+        else:
+            results_by_site.append(future.result())
+
+    if not results_by_site:
+        if captcha:
+            return (None, True)
+        elif error is not None:
+            if not exit_on_error:
+                raise error
+
+            print_status("Rebound was unable to fetch Stack Overflow results. "
+                         "Please check that you are connected to the internet.\n")
+            sys.exit(1)
+
+    return (merge_search_results(results_by_site), False)
+
+
+def search_all(queries):
+    """Runs the searches for several queries, at most MAX_CONCURRENT_SEARCHES at a
+    time. Returns the (query, search_results) pairs that found something and
+    whether any search hit a captcha page."""
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SEARCHES) as executor:
+        futures = [executor.submit(search_stackoverflow, query, exit_on_error=False) for query in queries]
+
+    search_groups, captcha, errors = [], False, 0
+    for query, future in zip(queries, futures):
+        if future.exception() is not None:
+            errors += 1
+            continue
+
+        search_results, blocked = future.result()
+        captcha = captcha or blocked
+        if search_results:
+            search_groups.append((query, search_results))
+
+    if queries and errors == len(queries):
+        print_status("Rebound was unable to fetch Stack Overflow results. "
+                     "Please check that you are connected to the internet.\n")
+        sys.exit(1)
+
+    return (search_groups, captcha)
+
 
+def fetch_question_and_answers(url, exit_on_error=True):
+    """Returns details about a given question and list of its answers, or None
+    for a captcha page."""
+    if get_backend() == "api":
+        return api_get_question_and_answers(url)
 
-def get_question_and_answers(url):
-    """Returns details about a given question and list of its answers."""
-    soup = souper(url)
+    soup = souper(get_answers_url(url), exit_on_error)
 
     if soup == None: # Captcha page
-        return "Sorry, Stack Overflow blocked our request. Try again in a couple seconds.", "", "", ""
+        return None
+    else:
+        return parse_question(soup, url)
+
+
+def get_more_answers(url, start):
+    """Returns the answers to a question after the first `start`, sorted by votes,
+    at most a page's worth at a time. Returns an empty list when there are no more."""
+    if get_backend() == "api":
+        return api_get_more_answers(url, start)
+
+    stashed_start, answers = _unparsed_answers.pop(normalize_url(url), (None, []))
+    if stashed_start != start: # Not on the page we already have
+        soup = souper(get_answers_url(url, start // ANSWERS_PER_PAGE + 1), exit_on_error=False)
+        if soup == None: # Captcha page
+            return []
+
+        answers = soup.find_all("div", class_="s-prose js-post-body")[1:][start % ANSWERS_PER_PAGE:]
+
+    return [stylize_code(answer) for answer in answers]
+
+
+def request_question(url):
+    """Returns details about a given question and list of its answers, from the
+    shared cache if there is one, or None for a captcha page."""
+    question = None
+    if get_cache_url():
+        try:
+            question = cache_request("/question", {"url": url})
+            if question is not None:
+                question_title, question_desc, question_stats, answers = question
+                question = (question_title, markup_from_json(question_desc), question_stats,
+                            [markup_from_json(answer) for answer in answers])
+        except requests.exceptions.RequestException:
+            question = fetch_question_and_answers(url) # Cache is down, fetch it ourselves
     else:
-        question_title = soup.find_all('a', class_="question-hyperlink")[0].get_text()
-        question_stats = soup.find("div", attrs={"itemprop": "upvoteCount"}).get_text() # Vote count
-        question_stats += " Votes | Asked " + soup.find("time", attrs={"itemprop": "dateCreated"}).get_text() # Date created
-        question_desc = stylize_code(soup.find_all("div", class_="s-prose js-post-body")[0]) # TODO: Handle duplicates
+        question = fetch_question_and_answers(url)
+
+    return question
 
-        answers = [stylize_code(answer) for answer in soup.find_all("div", class_="s-prose js-post-body")][1:]
-        if len(answers) == 0:
-            answers.append(urwid.Text(("no answers", u"\nNo answers for this question.")))
 
-        return question_title, question_desc, question_stats, answers
+def get_question_and_answers(url, on_update=None):
+    """Returns details about a given question and list of its answers. With the
+    local question cache on, a cached copy is returned right away and, if it's
+    stale, revalidated in the background; on_update(question) is called if
+    the question changed."""
+    if _question_cache_dir is None:
+        question = request_question(url)
+    else:
+        entry = load_cached_question(url)
+        if entry is None:
+            question = fetch_cached_question(url)
+        else:
+            question = entry["question"]
+            if time.time() - entry["checked_at"] > QUESTION_FRESH_FOR:
+                thread = Thread(target=revalidate_question, args=(url, entry, on_update))
+                thread.daemon = True
+                thread.start()
+
+    if question is None: # Captcha page
+        return "Sorry, Stack Overflow blocked our request. Try again in a couple seconds.", [], "", []
+    else:
+        return question
 
 
-############
-## INTERFACE
-############
+#########################
+## LOCAL QUESTION CACHE
+#########################
 
 
-## Helper Classes ##
+_question_cache_dir = None # Off unless use_question_cache() is called
 
 
-class Scrollable(urwid.WidgetDecoration):
-    # TODO: Fix scrolling behavior (works with up/down keys, not with cursor)
+## Helper Functions ##
 
-    def sizing(self):
-        return frozenset([BOX,])
 
+def use_question_cache(cache_dir):
+    """Turns on the local question cache, stored in the given directory."""
+    global _question_cache_dir
+    _question_cache_dir = cache_dir
 
-    def selectable(self):
-        return True
 
+def get_question_cache_path(url):
+    return os.path.join(_question_cache_dir, hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest() + ".json")
 
-    def __init__(self, widget):
-        """Box widget (wrapper) that makes a fixed or flow widget vertically scrollable."""
-        self._trim_top = 0
-        self._scroll_action = None
-        self._forward_keypress = None
-        self._old_cursor_coords = None
-        self._rows_max_cached = 0
-        self._rows_max_displayable = 0
-        self.__super.__init__(widget)
 
+def get_question_digest(question):
+    return hashlib.sha256(json.dumps(question).encode("utf-8")).hexdigest()
 
-    def render(self, size, focus=False):
-        maxcol, maxrow = size
 
-        # Render complete original widget
-        ow = self._original_widget
-        ow_size = self._get_original_widget_size(size)
-        canv = urwid.CompositeCanvas(ow.render(ow_size, focus))
-        canv_cols, canv_rows = canv.cols(), canv.rows()
+def load_cached_question(url):
+    """Returns the cached entry for a question, or None. The entry's checked_at
+    is the last time it was (re)validated, i.e. the file's modification time."""
+    path = get_question_cache_path(url)
+    try:
+        with open(path, encoding="utf-8") as file:
+            entry = json.load(file)
+        entry["checked_at"] = os.path.getmtime(path)
+    except (OSError, ValueError):
+        return None
 
-        if canv_cols <= maxcol:
-            pad_width = maxcol - canv_cols
-            if pad_width > 0: # Canvas is narrower than available horizontal space
-                canv.pad_trim_left_right(0, pad_width)
+    question_title, question_desc, question_stats, answers = entry["question"]
+    entry["question"] = (question_title, markup_from_json(question_desc), question_stats,
+                         [markup_from_json(answer) for answer in answers])
+    return entry
+
+
+def store_cached_question(url, question, etag=None, last_modified=None, page_digest=None):
+    """Stores a question with what's needed to revalidate it later."""
+    path = get_question_cache_path(url)
+    entry = {
+        "url": url,
+        "question": question,
+        "digest": get_question_digest(question),
+        "page_digest": page_digest,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": time.time()
+    }
 
-        if canv_rows <= maxrow:
-            fill_height = maxrow - canv_rows
-            if fill_height > 0: # Canvas is lower than available vertical space
-                canv.pad_trim_top_bottom(0, fill_height)
-        self._rows_max_displayable = maxrow
-        if canv_cols <= maxcol and canv_rows <= maxrow: # Canvas is small enough to fit without trimming
-            return canv
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", 'w', encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass # Caching is best-effort
 
-        self._adjust_trim_top(canv, size)
 
-        # Trim canvas if necessary
-        trim_top = self._trim_top
-        trim_end = canv_rows - maxrow - trim_top
-        trim_right = canv_cols - maxcol
-        if trim_top > 0:
-            canv.trim(trim_top)
-        if trim_end > 0:
-            canv.trim_end(trim_end)
-        if trim_right > 0:
-            canv.pad_trim_left_right(0, -trim_right)
+def touch_cached_question(url):
+    """Marks a cached question as just revalidated, without rewriting it."""
+    try:
+        os.utime(get_question_cache_path(url))
+    except OSError:
+        pass
 
-        # Disable cursor display if cursor is outside of visible canvas parts
-        if canv.cursor is not None:
-            curscol, cursrow = canv.cursor
-            if cursrow >= maxrow or cursrow < 0:
-                canv.cursor = None
 
-        # Let keypress() know if original_widget should get keys
-        self._forward_keypress = bool(canv.cursor)
+## Main ##
 
-        return canv
 
+def fetch_cached_question(url, entry=None):
+    """Fetches a question into the local cache. Given a cached entry, it's a
+    revalidation: returns None (and keeps the entry) if nothing changed, without
+    reparsing the page if it's identical."""
+    if get_backend() == "html" and not get_cache_url(): # Straight from the site, so use conditional requests
+        headers = {}
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry is not None and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
 
-    def keypress(self, size, key):
-        if self._forward_keypress:
-            ow = self._original_widget
-            ow_size = self._get_original_widget_size(size)
+        response = get_page(get_answers_url(url), headers, exit_on_error=entry is None)
+        if response is None or response.status_code not in (200, 304): # Captcha page, rate limited or down
+            return None
 
-            # Remember previous cursor position if possible
-            if hasattr(ow, "get_cursor_coords"):
-                self._old_cursor_coords = ow.get_cursor_coords(ow_size)
+        page_digest = hashlib.sha256(response.content).hexdigest()
+        if entry is not None and (response.status_code == 304 or page_digest == entry.get("page_digest")):
+            touch_cached_question(url)
+            return None
 
-            key = ow.keypress(ow_size, key)
-            if key is None:
+        question = parse_question(BeautifulSoup(response.text, "html.parser"), url)
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+    else: # Through the API or the shared cache
+        if entry is not None and get_backend() == "api": # Check the question's activity date first
+            last_activity = api_get_last_activity(url)
+            if last_activity is None or last_activity <= entry.get("checked_at", entry["fetched_at"]): # Nothing since it was last checked
+                touch_cached_question(url)
                 return None
 
-        # Handle up/down, page up/down, etc
-        command_map = self._command_map
-        if command_map[key] == urwid.CURSOR_UP:
-            self._scroll_action = SCROLL_LINE_UP
-        elif command_map[key] == urwid.CURSOR_DOWN:
-            self._scroll_action = SCROLL_LINE_DOWN
-        elif command_map[key] == urwid.CURSOR_PAGE_UP:
-            self._scroll_action = SCROLL_PAGE_UP
-        elif command_map[key] == urwid.CURSOR_PAGE_DOWN:
-            self._scroll_action = SCROLL_PAGE_DOWN
-        elif command_map[key] == urwid.CURSOR_MAX_LEFT: # "home"
-            self._scroll_action = SCROLL_TO_TOP
-        elif command_map[key] == urwid.CURSOR_MAX_RIGHT: # "end"
-            self._scroll_action = SCROLL_TO_END
-        else:
-            return key
+        question = request_question(url)
+        if question is None:
+            return None
+        etag, last_modified, page_digest = None, None, None
 
-        self._invalidate()
+    if entry is not None and get_question_digest(question) == entry["digest"]: # Page changed, question didn't
+        store_cached_question(url, entry["question"], etag, last_modified, page_digest) # Updates fetched_at
+        return None
 
+    store_cached_question(url, question, etag, last_modified, page_digest)
+    return question
 
-    def mouse_event(self, size, event, button, col, row, focus):
-        ow = self._original_widget
-        if hasattr(ow, "mouse_event"):
-            ow_size = self._get_original_widget_size(size)
-            row += self._trim_top
-            return ow.mouse_event(ow_size, event, button, col, row, focus)
-        else:
-            return False
 
+def revalidate_question(url, entry, on_update=None):
+    """Runs in a background thread and calls on_update(question) if a cached
+    question has changed."""
+    try:
+        question = fetch_cached_question(url, entry)
+    except Exception: # Network or parsing errors, keep showing the cached copy (and don't print over the interface)
+        return
 
-    def _adjust_trim_top(self, canv, size):
-        """Adjust self._trim_top according to self._scroll_action"""
-        action = self._scroll_action
-        self._scroll_action = None
+    if question is not None and on_update is not None:
+        on_update(question)
 
-        maxcol, maxrow = size
-        trim_top = self._trim_top
-        canv_rows = canv.rows()
 
-        if trim_top < 0:
-            # Negative trim_top values use bottom of canvas as reference
-            trim_top = canv_rows - maxrow + trim_top + 1
+#################
+## SHARED CACHE
+#################
 
-        if canv_rows <= maxrow:
-            self._trim_top = 0  # Reset scroll position
-            return
 
-        def ensure_bounds(new_trim_top):
-            return max(0, min(canv_rows - maxrow, new_trim_top))
-
-        if action == SCROLL_LINE_UP:
-            self._trim_top = ensure_bounds(trim_top - 1)
-        elif action == SCROLL_LINE_DOWN:
-            self._trim_top = ensure_bounds(trim_top + 1)
-        elif action == SCROLL_PAGE_UP:
-            self._trim_top = ensure_bounds(trim_top - maxrow+1)
-        elif action == SCROLL_PAGE_DOWN:
-            self._trim_top = ensure_bounds(trim_top + maxrow-1)
-        elif action == SCROLL_TO_TOP:
-            self._trim_top = 0
-        elif action == SCROLL_TO_END:
-            self._trim_top = canv_rows - maxrow
-        else:
-            self._trim_top = ensure_bounds(trim_top)
+## Helper Functions ##
 
-        if self._old_cursor_coords is not None and self._old_cursor_coords != canv.cursor:
-            self._old_cursor_coords = None
-            curscol, cursrow = canv.cursor
-            if cursrow < self._trim_top:
-                self._trim_top = cursrow
-            elif cursrow >= self._trim_top + maxrow:
-                self._trim_top = max(0, cursrow - maxrow + 1)
 
+def get_cache_url():
+    """Returns the URL of the shared cache service, if one is configured."""
+    return os.environ.get("REBOUND_CACHE_URL", "").rstrip('/')
 
-    def _get_original_widget_size(self, size):
-        ow = self._original_widget
-        sizing = ow.sizing()
-        if FIXED in sizing:
-            return ()
-        elif FLOW in sizing:
-            return (size[0],)
 
+def normalize_query(query):
+    """Normalizes a search query so trivially different queries share a cache entry."""
+    return ' '.join(query.lower().split())
 
-    def get_scrollpos(self, size=None, focus=False):
-        return self._trim_top
 
+def normalize_url(url):
+    """Normalizes a question URL (no scheme, query string, fragment or slug)."""
+    url = url.split('#', 1)[0].split('?', 1)[0].split("//", 1)[-1]
+    m = re.match(r"([^/]+/questions/\d+)", url)
+    return (m.group(1) if m else url.rstrip('/')).lower()
 
-    def set_scrollpos(self, position):
-        self._trim_top = int(position)
-        self._invalidate()
 
+def markup_from_json(markup):
+    """Turns text markup that went through JSON back into strings and tuples."""
+    if isinstance(markup, list):
+        return [tuple(item) if isinstance(item, list) else item for item in markup]
 
-    def rows_max(self, size=None, focus=False):
-        if size is not None:
-            ow = self._original_widget
-            ow_size = self._get_original_widget_size(size)
-            sizing = ow.sizing()
-            if FIXED in sizing:
-                self._rows_max_cached = ow.pack(ow_size, focus)[1]
-            elif FLOW in sizing:
-                self._rows_max_cached = ow.rows(ow_size, focus)
-            else:
-                raise RuntimeError("Not a flow/box widget: %r" % self._original_widget)
-        return self._rows_max_cached
-
-    @property
-    def scroll_ratio(self):
-        return self._rows_max_cached / self._rows_max_displayable
-
-class ScrollBar(urwid.WidgetDecoration):
-    # TODO: Change scrollbar size and color(?)
-
-    def sizing(self):
-        return frozenset((BOX,))
-
-
-    def selectable(self):
-        return True
-
-
-    def __init__(self, widget, thumb_char=u'\u2588', trough_char=' ',
-                 side=SCROLLBAR_RIGHT, width=1):
-        """Box widget that adds a scrollbar to `widget`."""
-        self.__super.__init__(widget)
-        self._thumb_char = thumb_char
-        self._trough_char = trough_char
-        self.scrollbar_side = side
-        self.scrollbar_width = max(1, width)
-        self._original_widget_size = (0, 0)
-        self._dragging = False
-
-
-    def render(self, size, focus=False):
-        maxcol, maxrow = size
-
-        ow = self._original_widget
-        ow_base = self.scrolling_base_widget
-        ow_rows_max = ow_base.rows_max(size, focus)
-        if ow_rows_max <= maxrow: # Canvas fits without scrolling - no scrollbar needed
-            self._original_widget_size = size
-            return ow.render(size, focus)
-
-        sb_width = self._scrollbar_width
-        self._original_widget_size = ow_size = (maxcol-sb_width, maxrow)
-        ow_canv = ow.render(ow_size, focus)
-
-        pos = ow_base.get_scrollpos(ow_size, focus)
-        posmax = ow_rows_max - maxrow
-
-        # Thumb shrinks/grows according to the ratio of
-        # <number of visible lines> / <number of total lines>
-        thumb_weight = min(1, maxrow / max(1, ow_rows_max))
-        thumb_height = max(1, round(thumb_weight * maxrow))
-
-        # Thumb may only touch top/bottom if the first/last row is visible
-        top_weight = float(pos) / max(1, posmax)
-        top_height = int((maxrow-thumb_height) * top_weight)
-        if top_height == 0 and top_weight > 0:
-            top_height = 1
-
-        # Bottom part is remaining space
-        bottom_height = maxrow - thumb_height - top_height
-        assert thumb_height + top_height + bottom_height == maxrow
-
-        # Create scrollbar canvas
-        top = urwid.SolidCanvas(self._trough_char, sb_width, top_height)
-        thumb = urwid.SolidCanvas(self._thumb_char, sb_width, thumb_height)
-        bottom = urwid.SolidCanvas(self._trough_char, sb_width, bottom_height)
-        sb_canv = urwid.CanvasCombine([
-            (top, None, False),
-            (thumb, None, False),
-            (bottom, None, False),
-        ])
-
-        combinelist = [(ow_canv, None, True, ow_size[0]), (sb_canv, None, False, sb_width)]
-        if self._scrollbar_side != SCROLLBAR_LEFT:
-            return urwid.CanvasJoin(combinelist)
-        else:
-            return urwid.CanvasJoin(reversed(combinelist))
-
-
-    @property
-    def scrollbar_width(self):
-        return max(1, self._scrollbar_width)
-
-
-    @scrollbar_width.setter
-    def scrollbar_width(self, width):
-        self._scrollbar_width = max(1, int(width))
-        self._invalidate()
-
-
-    @property
-    def scrollbar_side(self):
-        return self._scrollbar_side
-
-
-    @scrollbar_side.setter
-    def scrollbar_side(self, side):
-        if side not in (SCROLLBAR_LEFT, SCROLLBAR_RIGHT):
-            raise ValueError("scrollbar_side must be 'left' or 'right', not %r" % side)
-        self._scrollbar_side = side
-        self._invalidate()
-
-
-    @property
-    def scrolling_base_widget(self):
-        """Nearest `base_widget` that is compatible with the scrolling API."""
-        def orig_iter(w):
-            while hasattr(w, "original_widget"):
-                w = w.original_widget
-                yield w
-            yield w
-
-        def is_scrolling_widget(w):
-            return hasattr(w, "get_scrollpos") and hasattr(w, "rows_max")
-
-        for w in orig_iter(self):
-            if is_scrolling_widget(w):
-                return w
-
-    @property
-    def scrollbar_column(self):
-        if self.scrollbar_side == SCROLLBAR_LEFT:
-            return 0
-        if self.scrollbar_side == SCROLLBAR_RIGHT:
-            return self._original_widget_size[0]
-
-    def keypress(self, size, key):
-        return self._original_widget.keypress(self._original_widget_size, key)
-
-
-    def mouse_event(self, size, event, button, col, row, focus):
-        ow = self._original_widget
-        ow_size = self._original_widget_size
-        handled = False
-        if hasattr(ow, "mouse_event"):
-            handled = ow.mouse_event(ow_size, event, button, col, row, focus)
-
-        if not handled and hasattr(ow, "set_scrollpos"):
-            if button == 4: # Scroll wheel up
-                pos = ow.get_scrollpos(ow_size)
-                if pos > 0:
-                    ow.set_scrollpos(pos - 1)
-                    return True
-            elif button == 5: # Scroll wheel down
-                pos = ow.get_scrollpos(ow_size)
-                ow.set_scrollpos(pos + 1)
-                return True
-            elif col == self.scrollbar_column:
-                ow.set_scrollpos(int(row*ow.scroll_ratio))
-                if event == "mouse press":
-                    self._dragging = True
-                elif event == "mouse release":
-                    self._dragging = False
-            elif self._dragging:
-                ow.set_scrollpos(int(row*ow.scroll_ratio))
-                if event == "mouse release":
-                    self._dragging = False
+    return markup
 
 
+## Main ##
 
-        return False
+
+def cache_request(path, params):
+    """Asks the shared cache service for something. Returns None if upstream gave
+    us a captcha page and raises a RequestException if the cache is unavailable."""
+    response = get_session().get(get_cache_url() + path, params=params, timeout=SEARCH_DEADLINE)
+    if response.status_code == CACHE_CAPTCHA_STATUS:
+        return None
+
+    response.raise_for_status()
+    return response.json()
 
 
-class SelectableText(urwid.Text):
-    def selectable(self):
-        return True
+#######################
+## STACK EXCHANGE API
+#######################
 
 
-    def keypress(self, size, key):
-        return key
+_api_filters = {} # "<API URL> <included fields>" -> filter, also kept in CACHE_DIR since filters never change
+_api_filters_lock = Lock()
+_api_questions = {} # Question URL -> (site, question item), filled in by searches
+_api_answers = {} # Question URL -> answer items, filled in by the batched answers call
+_api_backoffs = {} # Method -> time before which it mustn't be called again (the API's "backoff")
 
 
 ## Helper Functions ##
 
 
-def interleave(a, b):
-    result = []
-    while a and b:
-        result.append(a.pop(0))
-        result.append(b.pop(0))
+def get_backend():
+    """Returns which backend fetches results: "html" (scraping) or "api"."""
+    return os.environ.get("REBOUND_BACKEND", "html").lower()
+
+
+def get_api_method(path):
+    """Returns the API method a path calls, e.g. "/questions/{ids}/answers"."""
+    return re.sub(r"/[\d;]+(?=/|$)", "/{ids}", path)
+
+
+def api_request(path, params, site=None):
+    """Calls the Stack Exchange API and returns the decoded response, or None if
+    we're being throttled. Waits out any backoff the API asked for first."""
+    method = get_api_method(path)
+    wait = _api_backoffs.get(method, 0) - time.time()
+    if wait > 0:
+        time.sleep(wait)
+
+    params = dict(params)
+    if site is not None:
+        params["site"] = site
+    if "filter" not in params:
+        params["filter"] = get_api_filter()
+    if os.environ.get("REBOUND_API_KEY"):
+        params["key"] = os.environ["REBOUND_API_KEY"]
 
-    result.extend(a)
-    result.extend(b)
+    # Responses are always gzipped, requests takes care of decompressing them
+    response = get_session().get(SE_API_URL + path, params=params, timeout=SEARCH_DEADLINE)
+    data = response.json()
+    if data.get("backoff"):
+        _api_backoffs[method] = time.time() + data["backoff"]
 
-    return result
+    if data.get("error_id") == SE_API_THROTTLED:
+        return None
+    elif "error_id" in data:
+        raise requests.exceptions.HTTPError("%s: %s" % (data.get("error_name"), data.get("error_message")), response=response)
+
+    return data
+
+
+def get_api_filter_path():
+    return os.path.join(CACHE_DIR, "api_filters.json")
+
+
+def get_api_filter(fields=SE_API_FIELDS):
+    """Returns an API filter that only returns the given fields. Filters never
+    change, so each one is only ever created once and then read from CACHE_DIR."""
+    include = ';'.join(fields)
+    key = "%s %s" % (SE_API_URL, include)
+
+    with _api_filters_lock: # Concurrent searches would each create it
+        if key not in _api_filters:
+            try:
+                with open(get_api_filter_path(), encoding="utf-8") as file:
+                    _api_filters.update(json.load(file))
+            except (OSError, ValueError):
+                pass
+
+        if key not in _api_filters:
+            data = api_request("/filters/create", {"include": include, "base": "none", "unsafe": "false", "filter": "default"})
+            _api_filters[key] = data["items"][0]["filter"]
+
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with open(get_api_filter_path() + ".tmp", 'w', encoding="utf-8") as file:
+                    json.dump(_api_filters, file)
+                os.replace(get_api_filter_path() + ".tmp", get_api_filter_path())
+            except OSError:
+                pass # Caching is best-effort
+
+        return _api_filters[key]
+
+
+def get_api_site(url):
+    """Returns the API site parameter for a question URL."""
+    host = url.split("//", 1)[-1].split('/', 1)[0]
+    for name, site_url in SITES.items():
+        if site_url.endswith("//" + host):
+            return name
+
+    return host.split('.')[0] # e.g. math.stackexchange.com
+
+
+def api_fetch_answers(site, urls_by_id):
+    """Fetches the answers of up to SE_API_BATCH_SIZE questions in one call,
+    sorted by votes, and files them under each question's URL."""
+    ids = list(urls_by_id)[:SE_API_BATCH_SIZE]
+    data = api_request("/questions/%s/answers" % ';'.join(str(id) for id in ids), {
+        "pagesize": SE_API_BATCH_SIZE,
+        "sort": "votes",
+        "order": "desc"
+    }, site)
+    if data is None:
+        return
+
+    for id in ids:
+        _api_answers[urls_by_id[id]] = []
+    for answer in data["items"]:
+        _api_answers[urls_by_id[answer["question_id"]]].append(answer)
+
+
+def api_to_search_result(site_name, question):
+    """Converts an API question into the search result dictionary App uses."""
+    body = BeautifulSoup(question.get("body", ""), "html.parser").get_text()
+    return {
+        "Title": html.unescape(question["title"]),
+        "Body": ' '.join(body.split())[:EXCERPT_LENGTH],
+        "Tags": question.get("tags", []),
+        "Answers": question["answer_count"],
+        "URL": question["link"],
+        "Site": site_name
+    }
 
 
 ## Main ##
 
 
-class App(object):
-    def __init__(self, search_results):
-        self.search_results, self.viewing_answers = search_results, False
-        self.palette = [
-            ("title", "light cyan,bold", "default", "standout"),
-            ("stats", "light green", "default", "standout"),
-            ("menu", "black", "light cyan", "standout"),
-            ("reveal focus", "black", "light cyan", "standout"),
-            ("reveal viewed focus", "yellow, bold", "light cyan", "standout"),
-            ("no answers", "light red", "default", "standout"),
-            ("code", "brown", "default", "standout"),
-            ("viewed", "yellow", "default", "standout")
-        ]
-        self.menu = urwid.Text([
-            u'\n',
-            ("menu", u" ENTER "), ("light gray", u" View answers "),
-            ("menu", u" B "), ("light gray", u" Open browser "),
-            ("menu", u" Q "), ("light gray", u" Quit"),
-        ])
-
-        results = list(map(lambda result: urwid.AttrMap(SelectableText(self._stylize_title(result)), None, "reveal focus"), self.search_results)) # TODO: Add a wrap='clip' attribute
-        self.content = urwid.SimpleListWalker(results)
-        self.content_container = urwid.ListBox(self.content)
-        layout = urwid.Frame(body=self.content_container, footer=self.menu)
-
-        self.main_loop = urwid.MainLoop(layout, self.palette, unhandled_input=self._handle_input)
-        self.original_widget = self.main_loop.widget
-
-        self.main_loop.run()
-
-
-    def _handle_input(self, input):
-        if input == "enter" or (input[0]=='meta mouse press' and input[1]==1): # View answers   Either press Enter or "ALT + Left Click"
-            url = self._get_selected_link()
-
-            if url != None:
-                self.viewing_answers = True
-                question_title, question_desc, question_stats, answers = get_question_and_answers(url)
-
-                pile = urwid.Pile(self._stylize_question(question_title, question_desc, question_stats) + [urwid.Divider('*')] +
-                interleave(answers, [urwid.Divider('-')] * (len(answers) - 1)))
-                padding = ScrollBar(Scrollable(urwid.Padding(pile, left=2, right=2)))
-                #filler = urwid.Filler(padding, valign="top")
-                linebox = urwid.LineBox(padding)
-
-                menu = urwid.Text([
-                    u'\n',
-                    ("menu", u" ESC "), ("light gray", u" Go back "),
-                    ("menu", u" B "), ("light gray", u" Open browser "),
-                    ("menu", u" Q "), ("light gray", u" Quit"),
-                ])
-
-                # highlight the selected answer
-                _, idx = self.content_container.get_focus()
-                txt = self.content[idx].original_widget.text
-                self.content[idx] = urwid.AttrMap(SelectableText(txt), 'viewed', 'reveal viewed focus')
-
-                self.main_loop.widget = urwid.Frame(body=urwid.Overlay(linebox, self.content_container, "center", ("relative", 60), "middle", 23), footer=menu)
-        elif input in ('b', 'B') or (input[0]=='ctrl mouse press' and input[1]==1): # Open link     Either press (B or b) or "CTRL + Left Click"
-            url = self._get_selected_link()
-
-            if url != None:
-                webbrowser.open(url)
-        elif input == "esc": # Close window
-            if self.viewing_answers:
-                self.main_loop.widget = self.original_widget
-                self.viewing_answers = False
-            else:
-                raise urwid.ExitMainLoop()
-        elif input in ('q', 'Q'): # Quit
-            raise urwid.ExitMainLoop()
+def api_search_site(site, query, page=1, pagesize=FIRST_PAGE_SIZE):
+    """API counterpart of search_site: one search call plus one batched call for
+    the answers of every question that has any."""
+    site_name, site_url = site
+    data = api_request("/search/advanced", {
+        "q": query,
+        "page": page,
+        "pagesize": pagesize,
+        "sort": "relevance",
+        "order": "desc"
+    }, site_name)
+    if data is None: # Throttled, same as a captcha page
+        return None
+
+    urls_by_id = {}
+    for question in data["items"]:
+        _api_questions[question["link"]] = (site_name, question)
+        if question["answer_count"] > 0 and question["link"] not in _api_answers:
+            urls_by_id[question["question_id"]] = question["link"]
+
+    if urls_by_id:
+        api_fetch_answers(site_name, urls_by_id)
+
+    return [api_to_search_result(site_name, question) for question in data["items"]]
+
+
+def api_get_last_activity(url):
+    """Returns when a question or any of its answers last changed, or None."""
+    question_id = re.search(r"/questions/(\d+)", url).group(1)
+    data = api_request("/questions/%s" % question_id, {"filter": get_api_filter(SE_API_ACTIVITY_FIELDS)}, get_api_site(url))
+    if data is None or not data["items"]:
+        return None
+
+    return data["items"][0]["last_activity_date"]
+
+
+def api_get_question_and_answers(url):
+    """API counterpart of get_question_and_answers. Uses the question and answers
+    fetched with the search results when they're there."""
+    if url in _api_questions:
+        site_name, question = _api_questions[url]
+    else:
+        site_name = get_api_site(url)
+        question_id = re.search(r"/questions/(\d+)", url).group(1)
+        data = api_request("/questions/%s" % question_id, {}, site_name)
+        if data is None or not data["items"]:
+            return None
+        question = data["items"][0]
+        _api_questions[url] = (site_name, question)
+
+    if url not in _api_answers or len(_api_answers[url]) < min(question["answer_count"], TOP_ANSWERS):
+        api_fetch_answers(site_name, {question["question_id"]: url})
+
+    question_title = html.unescape(question["title"])
+    question_stats = "%d Votes | Asked %s" % (question["score"], time.strftime("%b %d, %Y", time.gmtime(question["creation_date"])))
+    question_desc = stylize_code(BeautifulSoup(question["body"], "html.parser"))
+
+    answers = [stylize_code(BeautifulSoup(answer["body"], "html.parser")) for answer in _api_answers.get(url, [])[:TOP_ANSWERS]]
+
+    return question_title, question_desc, question_stats, answers
+
+
+def api_get_more_answers(url, start):
+    """API counterpart of get_more_answers. Uses the answers fetched with the
+    search results first."""
+    answers = _api_answers.get(url, [])[start:start + ANSWERS_PER_PAGE]
+    if not answers:
+        question_id = re.search(r"/questions/(\d+)", url).group(1)
+        data = api_request("/questions/%s/answers" % question_id, {
+            "page": start // ANSWERS_PER_PAGE + 1,
+            "pagesize": ANSWERS_PER_PAGE,
+            "sort": "votes",
+            "order": "desc"
+        }, get_api_site(url))
+        answers = data["items"][start % ANSWERS_PER_PAGE:] if data is not None else []
+
+    return [stylize_code(BeautifulSoup(answer["body"], "html.parser")) for answer in answers]
+
+
+############
+## RANKING
+############
+
+
+## Helper Functions ##
 
 
-    def _get_selected_link(self):
-        focus_widget, idx = self.content_container.get_focus() # Gets selected item
-        title = focus_widget.base_widget.text
+def tokenize(text):
+    """Splits text into lowercase identifier-like terms."""
+    return [term for term in re.findall(r"[a-z_][a-z0-9_]+", text.lower()) if term not in TRACE_STOPWORDS]
 
-        for result in self.search_results:
-            if title == self._stylize_title(result): # Found selected title's search_result dict
-                return result["URL"]
 
+def get_trace_terms(stack_trace, error_msg=None):
+    """Returns a dictionary of weighted query terms pulled from a stack trace
+    (exception types, frame names and module names)."""
+    terms = {}
+    for term in tokenize(stack_trace):
+        terms[term] = terms.get(term, 0) + 1
 
-    def _stylize_title(self, search_result):
-        if search_result["Answers"] == 1:
-            return "%s (1 Answer)" % search_result["Title"]
+    weights = {term: math.log(1 + count) for term, count in terms.items()}
+    for exception_type in re.findall(r"\b(\w*(?:Error|Exception|Warning))\b", stack_trace):
+        term = exception_type.lower()
+        if term in weights:
+            weights[term] = EXCEPTION_WEIGHT
+
+    for term in tokenize(error_msg or ''):
+        weights[term] = max(weights.get(term, 0), MESSAGE_WEIGHT)
+
+    return weights
+
+
+## Main ##
+
+
+def rank_search_results(search_results, stack_trace, error_msg=None):
+    """Reorders search results by their BM25 score against a stack trace (and
+    the error message it ends in), keeping some of the original order as a prior."""
+    if not search_results or not stack_trace:
+        return search_results
+
+    query = get_trace_terms(stack_trace, error_msg)
+    docs = [tokenize(' '.join([result["Title"], result.get("Body", "")] + result.get("Tags", []))) for result in search_results]
+    avg_len = max(1, sum(len(doc) for doc in docs) / len(docs))
+
+    doc_freqs = {}
+    for doc in docs:
+        for term in set(doc):
+            if term in query:
+                doc_freqs[term] = doc_freqs.get(term, 0) + 1
+
+    idf = {term: math.log(1 + (len(docs) - df + 0.5) / (df + 0.5)) for term, df in doc_freqs.items()}
+
+    scores = []
+    for doc in docs:
+        term_freqs = {}
+        for term in doc:
+            if term in idf:
+                term_freqs[term] = term_freqs.get(term, 0) + 1
+
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(doc) / avg_len)
+        scores.append(sum(query[term] * idf[term] * tf * (BM25_K1 + 1) / (tf + norm) for term, tf in term_freqs.items()))
+
+    max_score = max(scores) or 1
+    ranked = sorted(range(len(search_results)),
+                    key=lambda i: -(scores[i] / max_score + RANK_PRIOR_WEIGHT * (1 - i / len(search_results))))
+
+    return [search_results[i] for i in ranked]
+
+
+#########
+## OUTPUT
+#########
+
+
+_plain_status = False # Set when results are printed to stdout, see use_plain_status()
+
+
+## Helper Functions ##
+
+
+def use_plain_status():
+    """Sends status messages to stderr, uncolored, so stdout only has results."""
+    global _plain_status
+    _plain_status = True
+
+
+def print_status(message, color=RED):
+    if _plain_status:
+        print("\n%s" % message, file=sys.stderr)
+    else:
+        print("\n%s%s%s" % (color, message, END))
+
+
+def format_markup(markup, output_format):
+    """Turns text markup from stylize_code into plain text or Markdown (with
+    fenced code blocks)."""
+    if not isinstance(markup, list):
+        markup = [markup]
+
+    text = []
+    for item in markup:
+        if isinstance(item, tuple):
+            attr, content = item
+            if attr == "code" and output_format != "text":
+                if content.startswith('\n'): # Code block
+                    text.append("\n```\n%s\n```\n" % content.strip('\n'))
+                else: # In-line code
+                    text.append("`%s`" % content)
+            else:
+                text.append(content)
         else:
-            return "%s (%s Answers)" % (search_result["Title"], search_result["Answers"])
+            text.append(item)
+
+    return ''.join(text).strip('\n')
+
+
+def get_top_answer(url):
+    """Returns the markup of the first answer to a question, or None."""
+    _, _, _, answers = get_question_and_answers(url)
+    return answers[0] if answers else None
+
+
+def fetch_in_order(func, items, window):
+    """Yields (item, func(item)) in order, with at most `window` calls running
+    or waiting to be written at once."""
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        pending = deque()
+        for item in items:
+            pending.append((item, executor.submit(func, item)))
+            if len(pending) >= window:
+                item, future = pending.popleft()
+                yield item, future.result()
+
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
+
+
+def format_result(query, search_result, top_answer, output_format):
+    """Formats one search result (and its top answer) as a block of output."""
+    if output_format == "json": # One object per line
+        record = {
+            "query": query,
+            "title": search_result["Title"],
+            "url": search_result["URL"],
+            "site": search_result["Site"],
+            "answers": search_result["Answers"],
+            "tags": search_result.get("Tags", [])
+        }
+        if top_answer is not None:
+            record["top_answer"] = format_markup(top_answer, "markdown")
+        return json.dumps(record)
+    elif output_format == "markdown":
+        answer_count = "1 answer" if search_result["Answers"] == 1 else "%s answers" % search_result["Answers"]
+        lines = ["### [%s](%s)" % (search_result["Title"], search_result["URL"]),
+                 "%s | %s\n" % (answer_count, search_result["Site"])]
+        if top_answer is not None:
+            lines.append(format_markup(top_answer, output_format) + '\n')
+        return '\n'.join(lines)
+    else:
+        answer_count = "1 Answer" if search_result["Answers"] == 1 else "%s Answers" % search_result["Answers"]
+        lines = ["%s (%s)" % (search_result["Title"], answer_count), search_result["URL"]]
+        if top_answer is not None:
+            lines.append('\n' + format_markup(top_answer, output_format))
+            lines.append('-' * 80)
+        return '\n'.join(lines) + '\n'
+
 
+## Main ##
 
-    def _stylize_question(self, title, desc, stats):
-        new_title = urwid.Text(("title", u"%s" % title))
-        new_stats = urwid.Text(("stats", u"%s\n" % stats))
 
-        return [new_title, desc, new_stats]
+def print_results(search_groups, output_format, show_answers=False):
+    """Writes search results, and optionally each one's top answer, straight to
+    stdout as they're fetched. Doesn't load the interface."""
+    for query, search_results in search_groups:
+        if output_format == "markdown":
+            sys.stdout.write("## %s\n\n" % query)
+        elif output_format == "text" and len(search_groups) > 1:
+            sys.stdout.write("%s\n%s\n\n" % (query, '=' * len(query)))
+
+        if show_answers:
+            results = fetch_in_order(lambda result: get_top_answer(result["URL"]), search_results, MAX_PENDING_ANSWERS)
+        else:
+            results = ((search_result, None) for search_result in search_results)
+
+        for search_result, top_answer in results:
+            sys.stdout.write(format_result(query, search_result, top_answer, output_format) + '\n')
+            sys.stdout.flush()
 
 
 #######
@@ -816,6 +1396,89 @@ def confirm(question):
         print("Please respond with 'yes' or 'no' (or 'y' or 'n').\n")
 
 
+def load_module(name):
+    """Imports one of rebound's other modules (e.g. the urwid interface, which
+    the non-interactive output doesn't need) on demand."""
+    if __package__:
+        return importlib.import_module("%s.%s" % (__package__, name))
+    else: # Not imported as part of the package (e.g. by the tests)
+        return importlib.import_module(name)
+
+
+def get_warm_up_urls():
+    """Returns the hosts a search will talk to first."""
+    if get_cache_url():
+        return [get_cache_url()]
+    elif get_backend() == "api":
+        return [SE_API_URL]
+    else:
+        return [site_url for name, site_url in get_sites()]
+
+
+def warm_up(urls, modules=()):
+    """Resolves and connects to the given hosts and imports the given modules, so
+    a search can start straight away. Failures are ignored, the search just
+    does the work itself."""
+    for module in modules:
+        try:
+            load_module(module)
+        except ImportError:
+            pass
+
+    session = get_session()
+    for url in urls:
+        try:
+            host = urlparse(url)
+            socket.getaddrinfo(host.hostname, host.port or (443 if host.scheme == "https" else 80))
+            session.head(url, headers={"User-Agent": random.choice(USER_AGENTS)}, timeout=WARM_UP_TIMEOUT).close() # Leaves an open connection in the pool
+        except (socket.error, requests.exceptions.RequestException):
+            pass
+
+
+def start_warm_up(options):
+    """Warms up in the background (i.e. while the program runs). It's a daemon
+    thread, so it's simply dropped if no error turns up."""
+    modules = ["interface"] if options["output"] is None else []
+    thread = Thread(target=warm_up, args=(get_warm_up_urls(), modules))
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def get_error_query(language, error_msg):
+    compiler = 'java' if language == 'javac' else language # Fix language compiler command
+    return "%s %s" % (compiler, error_msg)
+
+
+def parse_options(args):
+    """Splits rebound's own options off the front of the arguments. Returns None
+    if they're invalid."""
+    options = {"output": None if sys.stdout.isatty() else "text", "answers": False, "memo": False}
+    args = list(args)
+
+    while args and args[0] in ("-o", "--output", "-a", "--answers", "-m", "--memo"):
+        option = args.pop(0)
+        if option in ("-a", "--answers"):
+            options["answers"] = True
+        elif option in ("-m", "--memo"):
+            options["memo"] = True
+        elif args and args[0].lower() in OUTPUT_FORMATS:
+            options["output"] = args.pop(0).lower()
+        else:
+            print("\n%s%s%s" % (RED, "The output format must be one of: %s.\n" % ', '.join(OUTPUT_FORMATS), END))
+            return None, args
+
+    return options, args
+
+
+def show_results(search_groups, options, error_traces=None):
+    """Prints the results if an output format was picked, otherwise opens the interface."""
+    if options["output"] is not None:
+        print_results(search_groups, options["output"], options["answers"])
+    else:
+        load_module("interface").App(search_groups, error_traces=error_traces) # Opens interface
+
+
 def print_help():
     """Prints usage instructions."""
     print("%sRebound, V1.1.9a1 - Made by @shobrook%s\n" % (BOLD, END))
@@ -823,55 +1486,86 @@ def print_help():
     print("\n\n%sUsage:%s $ rebound %s[file_name]%s\n" % (UNDERLINE, END, YELLOW, END))
     print("\n$ python3 %stest.py%s   =>   $ rebound %stest.py%s" % (YELLOW, END, YELLOW, END))
     print("\n$ node %stest.js%s     =>   $ rebound %stest.js%s\n" % (YELLOW, END, YELLOW, END))
-    print("\nIf you just want to query Stack Overflow, use the -q parameter: $ rebound -q %sWhat is an array comprehension?%s\n\n" % (YELLOW, END))
+    print("\nIf you just want to query Stack Overflow, use the -q parameter: $ rebound -q %sWhat is an array comprehension?%s\n" % (YELLOW, END))
+    print("\nTo skip the interface (e.g. in CI), pick an output format with -o: $ rebound -o %stext|markdown|json%s %stest.py%s" % (YELLOW, END, YELLOW, END))
+    print("Add -a to also print the top answer to each result. Output that isn't a terminal defaults to text.\n")
+    print("\nTo reuse the last results when rerunning an unchanged file with a compile or syntax error, add -m: $ rebound -m %stest.java%s" % (YELLOW, END))
+    print("This also keeps the questions you open, so they load instantly next time.\n")
+    print("\nTo share results between machines, run a cache with $ rebound --serve-cache %s[port]%s and set REBOUND_CACHE_URL on the clients.\n\n" % (YELLOW, END))
 
 
 ## Main ##
 
 
 def main():
-    if len(sys.argv) == 1 or sys.argv[1].lower() == "-h" or sys.argv[1].lower() == "--help":
+    options, args = parse_options(sys.argv[1:])
+    if options is None: # Invalid options
+        return
+    elif options["memo"]:
+        use_question_cache(os.path.join(CACHE_DIR, "questions"))
+
+    if options["output"] is not None:
+        use_plain_status()
+
+    if len(args) == 0 or args[0].lower() == "-h" or args[0].lower() == "--help":
         print_help()
-    elif sys.argv[1].lower() == "-q" or sys.argv[1].lower() == "--query":
-        query = ' '.join(sys.argv[2:])
+    elif args[0].lower() == "--serve-cache":
+        load_module("cache_server").serve(int(args[1]) if len(args) > 1 else CACHE_PORT)
+    elif args[0].lower() == "-q" or args[0].lower() == "--query":
+        query = ' '.join(args[1:])
         search_results, captcha = search_stackoverflow(query)
 
         if search_results != []:
             if captcha:
-                print("\n%s%s%s" % (RED, "Sorry, Stack Overflow blocked our request. Try again in a minute.\n", END))
+                print_status("Sorry, Stack Overflow blocked our request. Try again in a minute.\n")
                 return
             else:
-                App(search_results) # Opens interface
+                show_results([(query, search_results)], options)
         else:
-            print("\n%s%s%s" % (RED, "No Stack Overflow results found.\n", END))
+            print_status("No Stack Overflow results found.\n")
     else:
-        language = get_language(sys.argv[1].lower()) # Gets the language name
+        language = get_language(args[0].lower()) # Gets the language name
         if language == '': # Unknown language
-            print("\n%s%s%s" % (RED, "Sorry, Rebound doesn't support this file type.\n", END))
+            print_status("Sorry, Rebound doesn't support this file type.\n")
             return
 
-        file_path = sys.argv[1:]
+        file_path = args
         if language == 'java':
             file_path = [f.replace('.class', '') for f in file_path]
-        output, error = execute([language] + file_path) # Compiles the file and pipes stdout
-        if (output, error) == (None, None): # Invalid file
-            return
 
-        error_msg = get_error_message(error, language) # Prepares error message for search
-        if error_msg != None:
-            language = 'java' if language == 'javac' else language # Fix language compiler command
-            query = "%s %s" % (language, error_msg)
-            search_results, captcha = search_stackoverflow(query)
-
-            if search_results != []:
-                if captcha:
-                    print("\n%s%s%s" % (RED, "Sorry, Stack Overflow blocked our request. Try again in a minute.\n", END))
-                    return
-                elif confirm("\nDisplay Stack Overflow results?"):
-                    App(search_results) # Opens interface
-            else:
-                print("\n%s%s%s" % (RED, "No Stack Overflow results found.\n", END))
+        echo = sys.stdout if options["output"] is None else sys.stderr # Keeps piped output parseable
+        memo = load_memo(language, file_path) if options["memo"] else None
+        if memo is not None: # Unchanged source with a deterministic error
+            error, search_groups = memo
+            echo.write(error)
+            error_msgs, captcha = get_error_messages(error, language), False
+        else:
+            start_warm_up(options)
+            output, error = execute([language] + file_path, echo) # Compiles the file and pipes stdout
+            if (output, error) == (None, None): # Invalid file
+                return
+
+            error_msgs = get_error_messages(error, language) # Prepares error messages for search
+            if error_msgs == []:
+                print_status("No error detected :)\n", CYAN)
+                return
+
+            queries = [get_error_query(language, error_msg) for error_msg in error_msgs[:MAX_ERROR_SEARCHES]]
+            search_groups, captcha = search_all(queries)
+
+            if options["memo"] and search_groups != []:
+                save_memo(language, file_path, error, search_groups)
+
+        if search_groups != []:
+            if options["output"] is not None or confirm("\nDisplay Stack Overflow results?"):
+                # Each group is ranked against its own error's part of the stack trace
+                error_traces = {get_error_query(language, error_msg): (trace, error_msg) for error_msg, trace in zip(error_msgs, get_error_traces(error, error_msgs, language))}
+                search_groups = [(query, rank_search_results(search_results, *error_traces.get(query, (error, None)))) for query, search_results in search_groups]
+                show_results(search_groups, options, error_traces)
+        elif captcha:
+            print_status("Sorry, Stack Overflow blocked our request. Try again in a minute.\n")
+            return
         else:
-            print("\n%s%s%s" % (CYAN, "No error detected :)\n", END))
+            print_status("No Stack Overflow results found.\n")
 
     return
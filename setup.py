@@ -34,8 +34,8 @@ setup(
     include_package_data=True,
     packages=["rebound"],
     entry_points={"console_scripts": ["rebound = rebound.rebound:main"]},
-    install_requires=["BeautifulSoup4", "requests", "urllib3", "urwid"],
-    requires=["BeautifulSoup4", "requests", "urllib3", "urwid"],
+    install_requires=["BeautifulSoup4", "requests", "urllib3", "urwid<2.2"],
+    requires=["BeautifulSoup4", "requests", "urllib3", "urwid<2.2"],
     python_requires=">=3",
     license="MIT"
 )
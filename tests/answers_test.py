@@ -0,0 +1,51 @@
+import pytest
+import sys
+import os
+from urllib.parse import urlparse, parse_qs
+sys.path.insert(0, os.path.join(os.path.dirname( __file__ ), "..", "rebound"))
+import rebound
+from tests.stand_ins import StandInHandler, local_server, question_page, serving
+
+# Constants and helper functions
+ANSWER_COUNT = 40 # Two pages
+
+class StandInSite(StandInHandler):
+    requests = []
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        StandInSite.requests.append(params)
+
+        page = int(params["page"][0])
+        first = (page - 1) * rebound.ANSWERS_PER_PAGE
+        answers = range(first, min(first + rebound.ANSWERS_PER_PAGE, ANSWER_COUNT))
+        self.send_body(question_page(answers))
+
+@pytest.fixture
+def question_url(monkeypatch):
+    StandInSite.requests = []
+    monkeypatch.delenv("REBOUND_CACHE_URL", raising=False)
+    monkeypatch.delenv("REBOUND_BACKEND", raising=False)
+    monkeypatch.setattr(rebound, "_unparsed_answers", {})
+    with serving(local_server(StandInSite)) as site_url:
+        yield site_url + "/questions/1/why-keyerror"
+
+def answer_numbers(answers):
+    return [int(rebound.format_markup(answer, "text")) for answer in answers]
+
+# Tests
+def test_answers_load_in_vote_order_a_page_at_a_time(question_url):
+    _, _, _, answers = rebound.get_question_and_answers(question_url)
+    assert answer_numbers(answers) == list(range(rebound.TOP_ANSWERS))
+    assert StandInSite.requests == [{"page": ["1"], "tab": ["votes"]}]
+
+    # Rest of the first page was already fetched
+    answers = rebound.get_more_answers(question_url, rebound.TOP_ANSWERS)
+    assert answer_numbers(answers) == list(range(rebound.TOP_ANSWERS, rebound.ANSWERS_PER_PAGE))
+    assert len(StandInSite.requests) == 1
+
+    answers = rebound.get_more_answers(question_url, rebound.ANSWERS_PER_PAGE)
+    assert answer_numbers(answers) == list(range(rebound.ANSWERS_PER_PAGE, ANSWER_COUNT))
+    assert StandInSite.requests[1] == {"page": ["2"], "tab": ["votes"]}
+
+    assert rebound.get_more_answers(question_url, ANSWER_COUNT) == []
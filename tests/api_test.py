@@ -0,0 +1,106 @@
+import pytest
+import sys
+import os
+import gzip
+import json
+from urllib.parse import urlparse, parse_qs
+sys.path.insert(0, os.path.join(os.path.dirname( __file__ ), "..", "rebound"))
+import rebound
+from tests.stand_ins import StandInHandler, local_server, serving
+
+# Constants and helper functions
+QUESTIONS = [
+    {"question_id": 1, "title": "Why do I get &quot;KeyError&quot;?", "link": "https://stackoverflow.com/questions/1/keyerror",
+     "answer_count": 2, "tags": ["python", "dictionary"], "body": "<p>My code raises <code>KeyError</code>.</p>\n",
+     "score": 10, "creation_date": 1262304000},
+    {"question_id": 2, "title": "Unanswered", "link": "https://stackoverflow.com/questions/2/unanswered",
+     "answer_count": 0, "tags": ["python"], "body": "<p>Nobody knows.</p>\n", "score": 0, "creation_date": 1262304000}
+]
+ANSWERS = [
+    {"answer_id": 10, "question_id": 1, "body": "<p>Use <code>dict.get</code>.</p>\n", "score": 5},
+    {"answer_id": 11, "question_id": 1, "body": "<p>Check the key first.</p>\n", "score": 2}
+]
+
+class StandInAPI(StandInHandler):
+    requests, backoff = [], None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        StandInAPI.requests.append((url.path, params))
+
+        if url.path == "/filters/create":
+            body = {"items": [{"filter": "!test"}]}
+        elif url.path == "/search/advanced":
+            body = {"items": QUESTIONS, "has_more": False}
+            if StandInAPI.backoff:
+                body["backoff"] = StandInAPI.backoff
+        elif url.path.endswith("/answers"):
+            ids = [int(id) for id in url.path.split('/')[2].split(';')]
+            body = {"items": [a for a in ANSWERS if a["question_id"] in ids], "has_more": False}
+        else:
+            body = {"error_id": 404, "error_name": "no_method", "error_message": "no method found with this name"}
+
+        self.send_body(gzip.compress(json.dumps(body).encode("utf-8")),
+                       [("Content-Type", "application/json; charset=utf-8"), ("Content-Encoding", "gzip")])
+
+@pytest.fixture
+def stand_in_api(tmpdir, monkeypatch):
+    with serving(local_server(StandInAPI)) as api_url:
+        StandInAPI.requests, StandInAPI.backoff = [], None
+        monkeypatch.setenv("REBOUND_BACKEND", "api")
+        monkeypatch.setattr(rebound, "SE_API_URL", api_url)
+        monkeypatch.setattr(rebound, "_api_filters", {})
+        monkeypatch.setattr(rebound, "CACHE_DIR", str(tmpdir))
+        monkeypatch.setattr(rebound, "_api_questions", {})
+        monkeypatch.setattr(rebound, "_api_answers", {})
+        monkeypatch.setattr(rebound, "_api_backoffs", {})
+        yield StandInAPI
+
+# Tests
+def test_api_search(stand_in_api):
+    search_results, captcha = rebound.search_stackoverflow("python KeyError", sites=[("stackoverflow", rebound.SO_URL)])
+    assert not captcha
+    assert search_results[0] == {
+        "Title": 'Why do I get "KeyError"?',
+        "Body": "My code raises KeyError.",
+        "Tags": ["python", "dictionary"],
+        "Answers": 2,
+        "URL": "https://stackoverflow.com/questions/1/keyerror",
+        "Site": "stackoverflow"
+    }
+
+    # One filter, one search and one batched answers call for the answered question
+    assert [path for path, params in stand_in_api.requests] == ["/filters/create", "/search/advanced", "/questions/1/answers"]
+    assert stand_in_api.requests[1][1]["filter"] == ["!test"]
+
+def test_api_filter_is_created_once(stand_in_api, monkeypatch):
+    queries = ["python KeyError", "python IndexError", "python TypeError", "python ValueError"]
+    rebound.search_all(queries)
+
+    monkeypatch.setattr(rebound, "_api_filters", {}) # Next run
+    rebound.search_stackoverflow("python KeyError", sites=[("stackoverflow", rebound.SO_URL)])
+    assert [path for path, params in stand_in_api.requests].count("/filters/create") == 1
+
+def test_api_backoff_is_honoured(stand_in_api, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(rebound.time, "sleep", sleeps.append)
+    stand_in_api.backoff = 10
+
+    site = [("stackoverflow", rebound.SO_URL)]
+    rebound.search_stackoverflow("python KeyError", sites=site)
+    assert sleeps == []
+    rebound.search_stackoverflow("python IndexError", sites=site)
+    assert len(sleeps) == 1 and 9 < sleeps[0] <= 10 # Only searches were asked to back off
+    assert rebound.get_api_method("/questions/1;2/answers") == "/questions/{ids}/answers"
+
+def test_api_question_and_answers(stand_in_api):
+    rebound.search_stackoverflow("python KeyError", sites=[("stackoverflow", rebound.SO_URL)])
+    request_count = len(stand_in_api.requests)
+
+    title, desc, stats, answers = rebound.get_question_and_answers("https://stackoverflow.com/questions/1/keyerror")
+    assert len(stand_in_api.requests) == request_count # Already fetched with the search
+    assert title == 'Why do I get "KeyError"?'
+    assert stats == "10 Votes | Asked Jan 01, 2010"
+    assert rebound.format_markup(desc, "text") == "My code raises KeyError."
+    assert [rebound.format_markup(answer, "text") for answer in answers] == ["Use dict.get.", "Check the key first."]
@@ -0,0 +1,79 @@
+import pytest
+import sys
+import os
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.join(os.path.dirname( __file__ ), "..", "rebound"))
+import rebound
+import cache_server
+from tests.stand_ins import serving
+
+# Constants and helper functions
+SEARCH_RESULTS = [{"Title": "KeyError", "Body": "", "Tags": [], "Answers": 1, "URL": "https://stackoverflow.com/questions/1/keyerror", "Site": "stackoverflow"}]
+QUESTION = ("KeyError", ["Why ", ("code", "d['x']"), "?"], "1 Votes | Asked today", [["Use ", ("code", "d.get")]])
+
+def slow_fetch_search(site, query, page, pagesize):
+    time.sleep(0.2) # Long enough for every request to arrive while it's in flight
+    return None if "captcha" in query else SEARCH_RESULTS
+
+def fetch_question(url, exit_on_error=True):
+    return QUESTION
+
+@pytest.fixture
+def server(monkeypatch):
+    server = cache_server.CacheServer(("127.0.0.1", 0), slow_fetch_search, fetch_question)
+    with serving(server) as cache_url:
+        monkeypatch.setenv("REBOUND_CACHE_URL", cache_url + '/')
+        yield server
+
+# Tests
+def test_identical_searches_are_coalesced(server):
+    site = ("stackoverflow", rebound.SO_URL)
+    queries = ["python KeyError", "Python  keyerror"] * 5 # Same query once normalized
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        results = list(executor.map(lambda query: rebound.search_site(site, query), queries))
+
+    assert results == [SEARCH_RESULTS] * len(queries)
+    assert server.store.upstream_fetches == 1
+
+    rebound.search_site(site, "python keyerror")
+    assert server.store.upstream_fetches == 1 # Served from the cache
+
+def test_captcha_pages_are_not_cached(server):
+    site = ("stackoverflow", rebound.SO_URL)
+    assert rebound.search_site(site, "captcha") is None
+    assert rebound.search_site(site, "captcha") is None
+    assert server.store.upstream_fetches == 2
+
+def test_question_markup_survives_the_cache(server):
+    assert rebound.get_question_and_answers("https://stackoverflow.com/questions/1/keyerror#answer-2") == QUESTION
+    assert rebound.get_question_and_answers("https://stackoverflow.com/questions/1/other-slug") == QUESTION
+    assert server.store.upstream_fetches == 1
+
+@pytest.mark.parametrize("path, params", [
+    ("/search", {"site": "evil:8080/x#", "q": "test"}),
+    ("/search", {"site": "127.0.0.1/", "q": "test"}),
+    ("/question", {"url": "http://169.254.169.254/latest/meta-data"}),
+    ("/question", {"url": "https://stackoverflow.com.evil.com/questions/1"}),
+    ("/question", {"url": "https://unix.stackexchange.com:8443/questions/1"}),
+    ("/question", {"url": "https://stackoverflow.com/users/1"})
+])
+def test_requests_for_other_hosts_are_rejected(server, path, params):
+    response = requests.get(rebound.get_cache_url() + path, params=params)
+    assert response.status_code == 400
+    assert server.store.upstream_fetches == 0
+
+def test_stack_exchange_sites_are_allowed():
+    assert cache_server.get_allowed_site("superuser") == ("superuser", "https://superuser.com")
+    assert cache_server.get_allowed_site("gamedev") == ("gamedev", "https://gamedev.stackexchange.com")
+    assert cache_server.get_allowed_url("https://gamedev.stackexchange.com/questions/1/x")
+
+def test_cache_evicts_least_recently_used():
+    store = cache_server.CacheStore(max_entries=2)
+    for key in ("a", "b", "a", "c"):
+        store.get(key, lambda: key, ttl=60)
+
+    assert store.get("a", lambda: "new", ttl=60) == store.get("a", lambda: "newer", ttl=60)
+    assert store.upstream_fetches == 3 # "b" was evicted, "a" never was
+    assert store.get("b", lambda: "b", ttl=60)[0] == 200 and store.upstream_fetches == 4
@@ -0,0 +1,47 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname( __file__ ), "..", "rebound"))
+import rebound
+
+# Constants and helper functions
+JAVAC_ERRORS = ' '.join([
+    "Main.java:3: error: cannot find symbol\n",
+    "        foo();\n",
+    "        ^\n",
+    "Main.java:4: error: ';' expected\n",
+    "Main.java:7: error: cannot find symbol\n",
+    "3 errors\n"
+])
+
+GO_ERRORS = ' '.join([
+    "# command-line-arguments\n",
+    "./main.go:5:2: undefined: foo\n",
+    "./main.go:6:2: undefined: bar\n",
+    "./main.go:9:2: undefined: foo\n"
+])
+
+PYTHON_CHAINED_ERRORS = '\n'.join([
+    "Traceback (most recent call last):",
+    '  File "main.py", line 2, in <module>',
+    "    {}['x']",
+    "KeyError: 'x'",
+    "",
+    "During handling of the above exception, another exception occurred:",
+    "",
+    "Traceback (most recent call last):",
+    '  File "main.py", line 4, in <module>',
+    "    1 / 0",
+    "ZeroDivisionError: division by zero",
+    ""
+])
+
+# Tests
+@pytest.mark.parametrize("error, language, expected_messages", [
+    (JAVAC_ERRORS, "javac", ["cannot find symbol", "';' expected"]),
+    (GO_ERRORS, "go run", ["undefined: foo", "undefined: bar"]),
+    (PYTHON_CHAINED_ERRORS, "python3", ["KeyError: 'x'", "ZeroDivisionError: division by zero"]),
+    ('', "python3", [])
+])
+def test_get_error_messages(error, language, expected_messages):
+    assert rebound.get_error_messages(error, language) == expected_messages
@@ -0,0 +1,151 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname( __file__ ), "..", "rebound"))
+import urwid
+import interface
+from tests.stand_ins import StandInLoop
+
+# Constants and helper functions
+def make_scrollable(rows=60, needles=(5, 40, 41)):
+    lines = ["line %d %s" % (i, "needle" if i in needles else "") for i in range(rows)]
+    scrollable = interface.Scrollable(urwid.Pile([urwid.Text(line) for line in lines]))
+    scrollable.render((30, 10))
+    return scrollable
+
+def make_result(i, site="stackoverflow"):
+    return {"Title": "question %d" % i, "Body": "", "Tags": [], "Answers": 1, "URL": "https://%s.com/q/%d" % (site, i), "Site": site}
+
+def make_app(search_groups, sites=(("stackoverflow", "https://stackoverflow.com"),)):
+    """An App that isn't running a main loop, with background calls run inline."""
+    app = interface.App.__new__(interface.App)
+    app.groups = [interface.SearchGroup(query, results) for query, results in search_groups]
+    app.sites, app.error_traces = list(sites), {}
+    app._header_rows = 1 if len(app.groups) > 1 else 0
+    app.content = urwid.SimpleListWalker([])
+    for group in app.groups:
+        if app._header_rows:
+            app.content.append(urwid.Text(group.query))
+        app.content.extend(app._stylize_results(group.search_results))
+    app._call_soon = lambda func, *args: func(*args)
+    return app
+
+def titles(app):
+    return [widget.base_widget.text for widget in app.content]
+
+# Tests
+def test_search_jumps_to_first_match_below_position():
+    scrollable = make_scrollable()
+    scrollable.set_scrollpos(20)
+    assert scrollable.search("NEEDLE") == 3
+    assert scrollable._search_matches[scrollable._search_current] == (40, 8)
+    assert scrollable.get_scrollpos() <= 40 < scrollable.get_scrollpos() + 10
+
+def test_search_next_wraps_around():
+    scrollable = make_scrollable()
+    scrollable.search("needle")
+    scrollable.search_next(-1)
+    assert scrollable._search_matches[scrollable._search_current] == (41, 8)
+    scrollable.search_next()
+    assert scrollable._search_matches[scrollable._search_current] == (5, 7)
+
+def test_matches_are_highlighted():
+    scrollable = make_scrollable()
+    scrollable.search("needle")
+    row = list(scrollable.render((30, 10)).content())[5]
+    assert ("search current", None, b"needle") in row
+
+def test_clear_search():
+    scrollable = make_scrollable()
+    scrollable.search("needle")
+    scrollable.clear_search()
+    row = list(scrollable.render((30, 10)).content())[5]
+    assert all(attr is None for attr, _, _ in row)
+
+def test_wheel_bursts_are_coalesced():
+    scrollable = make_scrollable()
+    loop = StandInLoop()
+    scrollbar = interface.ScrollBar(scrollable, main_loop=loop)
+    scrollbar.render((31, 10))
+
+    for i in range(20):
+        scrollbar.mouse_event((31, 10), "mouse press", 5, 0, 0, True)
+    assert scrollable.get_scrollpos() == 1 # First tick goes straight through
+    assert len(loop.alarms) == 1 # The rest wait for the next frame
+
+    scrollbar.mouse_event((31, 10), "mouse press", 4, 0, 0, True)
+    loop.fire_alarms()
+    assert scrollable.get_scrollpos() == 19
+
+@pytest.mark.parametrize("offset, expected", [(15, (2, 15)), (30, (2, 30)), (60, (3, 30)), (45, (4, 15))])
+def test_get_next_page(offset, expected):
+    assert interface.get_next_page(offset) == expected
+
+def test_fetch_next_page_continues_after_first_page(monkeypatch):
+    calls = []
+    def search_stackoverflow(query, page, pagesize, exit_on_error, sites):
+        calls.append((page, pagesize))
+        return [make_result(i) for i in range((page - 1) * pagesize, page * pagesize)], False
+    monkeypatch.setattr(interface, "search_stackoverflow", search_stackoverflow)
+
+    app = make_app([("query", [make_result(i) for i in range(15)])])
+    app._fetch_next_page(app.groups[0])
+    app._fetch_next_page(app.groups[0])
+
+    assert calls == [(2, 15), (2, 30)]
+    assert titles(app) == ["question %d (1 Answer)" % i for i in range(60)]
+    assert not app.groups[0].exhausted
+
+def test_append_page_skips_duplicates_and_keeps_groups_apart():
+    app = make_app([("first", [make_result(i) for i in range(15)]), ("second", [make_result(i) for i in range(100, 115)])])
+    app._append_page(app.groups[0], 15, [make_result(i) for i in range(10, 25)]) # 10-14 are already shown
+
+    assert titles(app)[1:26] == ["question %d (1 Answer)" % i for i in range(25)]
+    assert titles(app)[26] == "second"
+    assert len(app.groups[0].search_results) == 25
+
+@pytest.mark.parametrize("search_results", [None, [], [make_result(i) for i in range(5)]])
+def test_append_page_marks_last_page(search_results):
+    app = make_app([("query", [make_result(i) for i in range(15)])])
+    app._append_page(app.groups[0], 15, search_results)
+    assert app.groups[0].exhausted
+    assert not app.groups[0].fetching
+
+def test_fetch_next_page_pages_each_site_on_its_own(monkeypatch):
+    sites = [("stackoverflow", "https://stackoverflow.com"), ("superuser", "https://superuser.com")]
+    calls = []
+    def search_stackoverflow(query, page, pagesize, exit_on_error, sites):
+        calls.append((page, pagesize))
+        indices = range((page - 1) * pagesize, page * pagesize)
+        return interface.interleave([make_result(i) for i in indices], [make_result(i, "superuser") for i in indices]), False
+    monkeypatch.setattr(interface, "search_stackoverflow", search_stackoverflow)
+
+    app = make_app([("query", search_stackoverflow("query", 1, 15, False, sites)[0])], sites)
+    app._fetch_next_page(app.groups[0])
+
+    assert calls == [(1, 15), (2, 15)] # Results 16-30 of each site
+    urls = [result["URL"] for result in app.groups[0].search_results]
+    assert len(urls) == len(set(urls)) == 60
+
+def test_search_follows_resizes():
+    lines = ["word%d" % i for i in range(50)] + ["needle"]
+    scrollable = interface.Scrollable(urwid.Pile([urwid.Text(' '.join(lines))]))
+    scrollable.render((40, 10))
+    scrollable.search("needle")
+
+    rows = list(scrollable.render((30, 10)).content())
+    assert all(attr is None for row in rows for attr, _, text in row) # Old match position isn't painted
+
+    row, col = scrollable._search_matches[scrollable._search_current]
+    scrollable.set_scrollpos(row)
+    rows = list(scrollable.render((30, 10)).content())
+    assert ("search current", None, b"needle") in rows[row - scrollable.get_scrollpos()]
+
+def test_matches_after_wide_characters_are_highlighted_in_place():
+    scrollable = interface.Scrollable(urwid.Pile([urwid.Text(u"你好 needle")]))
+    scrollable.render((30, 10))
+    scrollable.search("needle")
+
+    row = list(scrollable.render((30, 10)).content())[0]
+    assert row[1] == ("search current", None, b"needle")
+    assert row[0][2] == u"你好 ".encode("utf-8")
@@ -0,0 +1,54 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname( __file__ ), "..", "rebound"))
+import rebound
+
+# Constants and helper functions
+SYNTAX_ERROR = '  File "broken.py", line 1\n    def\n       ^\nSyntaxError: invalid syntax\n'
+RUNTIME_ERROR = 'Traceback (most recent call last):\n  File "broken.py", line 1, in <module>\nKeyError: 1\n'
+SEARCH_GROUPS = [("python3 SyntaxError: invalid syntax", [{"Title": "Invalid syntax", "Answers": 1, "URL": "u", "Site": "stackoverflow"}])]
+
+@pytest.fixture
+def source_file(tmpdir, monkeypatch):
+    monkeypatch.setattr(rebound, "CACHE_DIR", str(tmpdir.join("cache")))
+    monkeypatch.chdir(tmpdir)
+    source = tmpdir.join("broken.py")
+    source.write("def\n")
+    return source
+
+# Tests
+def test_memo_is_reused_until_source_changes(source_file):
+    rebound.save_memo("python3", ["broken.py"], SYNTAX_ERROR, SEARCH_GROUPS)
+    assert rebound.load_memo("python3", ["broken.py"]) == (SYNTAX_ERROR, SEARCH_GROUPS)
+    assert rebound.load_memo("python3", ["broken.py", "--verbose"]) is None
+
+    source_file.write("def f(:\n")
+    assert rebound.load_memo("python3", ["broken.py"]) is None
+
+def test_memo_skips_runtime_errors(source_file):
+    rebound.save_memo("python3", ["broken.py"], RUNTIME_ERROR, SEARCH_GROUPS)
+    assert rebound.load_memo("python3", ["broken.py"]) is None
+
+@pytest.mark.parametrize("language, error, expected", [
+    ("python3", SYNTAX_ERROR, True),
+    ("python3", 'Traceback (most recent call last):\n  File "x.py", line 2, in <module>\n  File "<unknown>", line 1\n SyntaxError: invalid syntax\n', False), # ast.parse()
+    ("python3", RUNTIME_ERROR, False),
+    ("node", "/tmp/s.js:1\n let x = {;\n ^\n \n SyntaxError: Unexpected token ';'\n     at wrapSafe (node:internal/modules/cjs/loader:1464:18)\n", True),
+    ("node", "<anonymous_script>:1\n <x\n ^\n \n SyntaxError: Unexpected token '<', \"<x\" is not valid JSON\n     at JSON.parse (<anonymous>)\n     at Object.<anonymous> (/tmp/j.js:1:22)\n", False),
+    ("ruby", "s.rb:1: syntax error, unexpected end-of-input (SyntaxError)\n", True),
+    ("ruby", "e.rb:1:in `eval': (eval at e.rb:1):1: syntax error, unexpected end-of-input (SyntaxError)\n", False),
+    ("go run", "# command-line-arguments\n ./g.go:2:15: undefined: x\n", True),
+    ("go run", "panic: runtime error: index out of range [1] with length 0\n", False)
+])
+def test_is_deterministic_error(language, error, expected):
+    assert rebound.is_deterministic_error(error, language) == expected
+
+def test_memo_skips_json_parse_errors(tmpdir, monkeypatch):
+    monkeypatch.setattr(rebound, "CACHE_DIR", str(tmpdir.join("cache")))
+    monkeypatch.chdir(tmpdir)
+    tmpdir.join("read.js").write("JSON.parse(require('fs').readFileSync(0, 'utf8'))\n")
+    error = "<anonymous_script>:1\n <x\n ^\n \n SyntaxError: Unexpected token '<', \"<x\" is not valid JSON\n     at JSON.parse (<anonymous>)\n"
+
+    rebound.save_memo("node", ["read.js"], error, SEARCH_GROUPS)
+    assert rebound.load_memo("node", ["read.js"]) is None
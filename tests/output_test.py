@@ -0,0 +1,68 @@
+import pytest
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname( __file__ ), "..", "rebound"))
+import rebound
+
+# Constants and helper functions
+ANSWER = ["Use ", ("code", "dict.get"), ":\n", ("code", "\nvalue = d.get('x')\n"), "\n"]
+SEARCH_RESULT = {"Title": "KeyError in dict", "Answers": 1, "URL": "https://stackoverflow.com/questions/1/keyerror",
+                 "Site": "stackoverflow", "Tags": ["python"]}
+
+# Tests
+@pytest.mark.parametrize("output_format, expected_text", [
+    ("text", "Use dict.get:\n\nvalue = d.get('x')"),
+    ("markdown", "Use `dict.get`:\n\n```\nvalue = d.get('x')\n```")
+])
+def test_format_markup(output_format, expected_text):
+    assert rebound.format_markup(ANSWER, output_format) == expected_text
+
+def test_print_results_json(monkeypatch, capsys):
+    monkeypatch.setattr(rebound, "get_question_and_answers", lambda url: ("", "", "", [ANSWER]))
+    rebound.print_results([("python KeyError", [SEARCH_RESULT] * 6)], "json", show_answers=True)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 6
+    assert json.loads(lines[0]) == {
+        "query": "python KeyError",
+        "title": "KeyError in dict",
+        "url": "https://stackoverflow.com/questions/1/keyerror",
+        "site": "stackoverflow",
+        "answers": 1,
+        "tags": ["python"],
+        "top_answer": "Use `dict.get`:\n\n```\nvalue = d.get('x')\n```"
+    }
+
+def test_parse_options():
+    options, args = rebound.parse_options(["-o", "JSON", "--answers", "test.py", "-o"])
+    assert (options["output"], options["answers"], args) == ("json", True, ["test.py", "-o"])
+    assert rebound.parse_options(["--output", "html", "test.py"])[0] is None
+
+def test_program_output_stays_out_of_results(tmpdir, monkeypatch, capsys):
+    script = tmpdir.join("crash.py")
+    script.write("print('hello from child')\nraise KeyError('x')\n")
+    monkeypatch.setattr(rebound, "search_all", lambda queries: ([(queries[0], [SEARCH_RESULT])], False))
+    monkeypatch.setattr(sys, "argv", ["rebound", "-o", "json", str(script)])
+    monkeypatch.setattr(rebound, "_plain_status", False)
+    rebound.main()
+
+    captured = capsys.readouterr()
+    assert [json.loads(line)["title"] for line in captured.out.splitlines()] == ["KeyError in dict"]
+    assert "hello from child" in captured.err and "KeyError" in captured.err
+
+@pytest.mark.parametrize("source, search_groups, expected", [
+    ("print('fine')\n", None, "No error detected :)"),
+    ("raise KeyError('x')\n", [], "No Stack Overflow results found.")
+])
+def test_status_messages_stay_out_of_results(tmpdir, monkeypatch, capsys, source, search_groups, expected):
+    script = tmpdir.join("script.py")
+    script.write(source)
+    monkeypatch.setattr(rebound, "search_all", lambda queries: (search_groups, False))
+    monkeypatch.setattr(sys, "argv", ["rebound", "-o", "json", str(script)])
+    monkeypatch.setattr(rebound, "_plain_status", False)
+    rebound.main()
+
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert expected in captured.err and '\033' not in captured.err
@@ -0,0 +1,92 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname( __file__ ), "..", "rebound"))
+import rebound
+from tests.stand_ins import StandInHandler, local_server, question_page, serving
+
+# Constants and helper functions
+class StandInSite(StandInHandler):
+    answers, requests, status = ["Use get"], [], 200
+
+    def do_GET(self):
+        etag = '"%d"' % len(StandInSite.answers)
+        StandInSite.requests.append(self.headers.get("If-None-Match"))
+        if StandInSite.status != 200:
+            self.send_body(b"Slow down", status=StandInSite.status)
+            return
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_body(question_page(StandInSite.answers), [("ETag", etag)])
+
+@pytest.fixture
+def question_url(tmpdir, monkeypatch):
+    StandInSite.answers, StandInSite.requests, StandInSite.status = ["Use get"], [], 200
+    monkeypatch.delenv("REBOUND_CACHE_URL", raising=False)
+    monkeypatch.delenv("REBOUND_BACKEND", raising=False)
+    monkeypatch.setattr(rebound, "_question_cache_dir", str(tmpdir))
+    with serving(local_server(StandInSite)) as site_url:
+        yield site_url + "/questions/1/why-keyerror"
+
+def make_stale(url):
+    os.utime(rebound.get_question_cache_path(url), (0, 0))
+
+# Tests
+def test_fresh_questions_are_not_revalidated(question_url):
+    question = rebound.get_question_and_answers(question_url)
+    assert rebound.get_question_and_answers(question_url) == question
+    assert StandInSite.requests == [None]
+
+def test_unchanged_questions_are_revalidated_conditionally(question_url, monkeypatch):
+    rebound.get_question_and_answers(question_url)
+    make_stale(question_url)
+
+    monkeypatch.setattr(rebound, "parse_question", None) # Must not reparse
+    updates = []
+    rebound.revalidate_question(question_url, rebound.load_cached_question(question_url), updates.append)
+
+    assert StandInSite.requests == [None, '"1"']
+    assert updates == []
+    assert rebound.load_cached_question(question_url)["checked_at"] > 0 # Fresh again
+
+def test_changed_questions_are_updated(question_url):
+    question = rebound.get_question_and_answers(question_url)
+    make_stale(question_url)
+    StandInSite.answers = ["Use get", "Catch it"]
+
+    updates = []
+    entry = rebound.load_cached_question(question_url)
+    assert rebound.get_question_and_answers(question_url) == question # Stale copy shows right away
+    rebound.revalidate_question(question_url, entry, updates.append)
+
+    assert len(updates) == 1 and len(updates[0][3]) == 2
+    assert rebound.load_cached_question(question_url)["question"] == updates[0]
+
+def test_shared_cache_revalidation_stays_off_the_api(question_url, monkeypatch):
+    question = rebound.get_question_and_answers(question_url)
+    make_stale(question_url)
+    entry = rebound.load_cached_question(question_url)
+
+    monkeypatch.setenv("REBOUND_CACHE_URL", "http://cache:8585")
+    monkeypatch.setattr(rebound, "api_get_last_activity", None) # Must not be called
+    monkeypatch.setattr(rebound, "request_question", lambda url: question)
+    updates = []
+    rebound.revalidate_question(question_url, entry, updates.append)
+
+    assert updates == []
+    assert rebound.load_cached_question(question_url)["fetched_at"] > entry["fetched_at"]
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_failed_revalidation_keeps_the_cached_copy(question_url, status):
+    question = rebound.get_question_and_answers(question_url)
+    make_stale(question_url)
+    StandInSite.answers, StandInSite.status = ["Use get", "Catch it"], status
+
+    updates = []
+    rebound.revalidate_question(question_url, rebound.load_cached_question(question_url), updates.append)
+
+    assert updates == []
+    assert rebound.load_cached_question(question_url)["question"] == question
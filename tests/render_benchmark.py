@@ -0,0 +1,55 @@
+"""Times rendering a long answer page while scrolling it with the mouse wheel,
+with and without coalescing. Run it directly: $ python tests/render_benchmark.py"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname( __file__ ), "..", "rebound"))
+sys.path.append(os.path.join(os.path.dirname( __file__ ), "..")) # For tests.stand_ins, after rebound/
+import urwid
+import interface
+from tests.stand_ins import StandInLoop
+
+# Constants and helper functions
+ANSWERS = 200
+WHEEL_TICKS = 300
+TICKS_PER_BATCH = 10 # Wheel events the terminal delivers at once during a fast spin
+SIZE = (100, 40)
+
+def long_page():
+    answer = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20
+    widgets = []
+    for i in range(ANSWERS):
+        widgets.extend([urwid.Divider('─'), urwid.Text(("answer %d: " % i) + answer)])
+    return interface.Scrollable(urwid.Pile(widgets))
+
+def spin(main_loop):
+    """Scrolls down one wheel tick at a time, redrawing after every batch of
+    input like urwid's main loop does. Returns (seconds, redraws)."""
+    scrollbar = interface.ScrollBar(long_page(), main_loop=main_loop)
+    scrollbar.render(SIZE, True)
+
+    redraws, start = 0, time.perf_counter()
+    for tick in range(WHEEL_TICKS):
+        scrollbar.mouse_event(SIZE, "mouse press", 5, 0, 0, True)
+        if main_loop is None: # Without coalescing every event redraws
+            scrollbar.render(SIZE, True)
+            redraws += 1
+        elif tick % TICKS_PER_BATCH == TICKS_PER_BATCH - 1:
+            main_loop.fire_alarms() # Stands in for the frame timer
+            scrollbar.render(SIZE, True)
+            redraws += 1
+
+    return time.perf_counter() - start, redraws
+
+def main():
+    start = time.perf_counter()
+    long_page().render(SIZE, True)
+    print("First render of %d answers: %.1f ms" % (ANSWERS, (time.perf_counter() - start) * 1000))
+
+    for label, main_loop in (("per event", None), ("coalesced", StandInLoop())):
+        seconds, redraws = spin(main_loop)
+        print("%d wheel ticks, %s: %.1f ms, %d redraws" % (WHEEL_TICKS, label, seconds * 1000, redraws))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import pytest
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname( __file__ ), "..", "rebound"))
+import rebound
+
+# Constants and helper functions
+def gen_result(title, site="stackoverflow"):
+    return {"Title": title, "Answers": 1, "URL": "https://%s.com/q/%s" % (site, title), "Site": site}
+
+# Tests
+def test_merge_search_results_interleaves_by_rank():
+    so = [gen_result("a"), gen_result("b"), gen_result("c")]
+    sf = [gen_result("x", "serverfault")]
+    merged = rebound.merge_search_results([so, sf])
+    assert [r["Title"] for r in merged] == ["a", "x", "b", "c"]
+
+def test_merge_search_results_drops_duplicates():
+    so = [gen_result("a"), gen_result("Same question")]
+    su = [gen_result("same question", "superuser"), gen_result("a", "superuser")]
+    merged = rebound.merge_search_results([so, su, [gen_result("a")]])
+    assert [(r["Title"], r["Site"]) for r in merged] == [("a", "stackoverflow"), ("same question", "superuser")]
+
+@pytest.mark.parametrize("env, expected", [
+    ("stackoverflow", [("stackoverflow", "https://stackoverflow.com")]),
+    ("serverfault, Unix", [("serverfault", "https://serverfault.com"), ("unix", "https://unix.stackexchange.com")]),
+    ("math", [("math", "https://math.stackexchange.com")])
+])
+def test_get_sites(monkeypatch, env, expected):
+    monkeypatch.setenv("REBOUND_SITES", env)
+    assert rebound.get_sites() == expected
+
+def test_rank_search_results_prefers_matching_frames():
+    stack_trace = ('Traceback (most recent call last):\n'
+                   '  File "app.py", line 3, in <module>\n'
+                   '    import pandas\n'
+                   '  File "/usr/lib/python3/site-packages/pandas/__init__.py", line 11, in <module>\n'
+                   '    import numpy\n'
+                   "ModuleNotFoundError: No module named 'numpy'\n")
+    search_results = [gen_result("How do I install a package?"), gen_result("Importing pandas fails: no module named numpy")]
+    search_results[1]["Tags"] = ["python", "pandas", "numpy"]
+    ranked = rebound.rank_search_results(search_results, stack_trace)
+    assert [r["Title"] for r in ranked] == ["Importing pandas fails: no module named numpy", "How do I install a package?"]
+
+def test_rank_search_results_keeps_order_without_matches():
+    search_results = [gen_result("a"), gen_result("b"), gen_result("c")]
+    assert rebound.rank_search_results(search_results, "KeyError: 'x'") == search_results
+
+def test_get_error_traces():
+    error = ('Traceback (most recent call last):\n'
+             '  File "app.py", line 2, in load\n'
+             "KeyError: 'config'\n"
+             '\n'
+             'During handling of the above exception, another exception occurred:\n'
+             '\n'
+             'Traceback (most recent call last):\n'
+             '  File "app.py", line 4, in <module>\n'
+             '    import yaml\n'
+             "ModuleNotFoundError: No module named 'yaml'\n")
+    error_msgs = rebound.get_error_messages(error, "python3")
+    key_trace, module_trace = rebound.get_error_traces(error, error_msgs, "python3")
+    assert "load" in key_trace and "yaml" not in key_trace
+    assert "import yaml" in module_trace and "KeyError" not in module_trace
+
+    error = "A.java:3: error: cannot find symbol\n    foo();\n    ^\nA.java:5: error: ';' expected\n    int x\n"
+    assert rebound.get_error_traces(error, rebound.get_error_messages(error, "javac"), "javac") == [
+        "A.java:3: error: cannot find symbol\n    foo();\n    ^", "A.java:5: error: ';' expected\n    int x\n"]
+
+def test_rank_search_results_weighs_own_error_message():
+    search_results = [gen_result("IndexError in a loop"), gen_result("KeyError reading a dict")]
+    ranked = rebound.rank_search_results(search_results, "File app.py, in main", "KeyError: 'x'")
+    assert ranked[0]["Title"] == "KeyError reading a dict"
+
+def test_slow_sites_are_left_behind(monkeypatch):
+    released, daemons = threading.Event(), []
+    def search_site(site, query, page, pagesize):
+        daemons.append(threading.current_thread().daemon)
+        if site[0] == "slow":
+            released.wait()
+        return [gen_result(site[0])]
+    monkeypatch.setattr(rebound, "search_site", search_site)
+    monkeypatch.setattr(rebound, "SEARCH_DEADLINE", 0.2)
+
+    search_results, captcha = rebound.search_stackoverflow("test", sites=[("fast", ''), ("slow", '')])
+    released.set()
+    assert [r["Title"] for r in search_results] == ["fast"]
+    assert daemons == [True, True] # Can't hold up exit
@@ -0,0 +1,61 @@
+"""Stand-ins the tests share: a question page template, a local HTTP server
+and a main loop that only collects alarms."""
+
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from threading import Thread
+
+# Constants and helper functions
+QUESTION_PAGE = """<html><body>
+<a class="question-hyperlink">Why KeyError?</a>
+<div itemprop="upvoteCount">3</div><time itemprop="dateCreated">Jan 1, 2020</time>
+<div class="s-prose js-post-body"><p>Question</p>\n</div>
+%s
+</body></html>"""
+ANSWER = '<div class="s-prose js-post-body"><p>%s</p>\n</div>'
+
+def question_page(answers):
+    return (QUESTION_PAGE % ''.join(ANSWER % answer for answer in answers)).encode("utf-8")
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def send_body(self, body, headers=(), status=200):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def local_server(handler, threaded=False):
+    """An HTTP server on a free local port."""
+    server = (ThreadingHTTPServer if threaded else HTTPServer)(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    return server
+
+@contextmanager
+def serving(server):
+    """Runs a server in the background for the duration of the block. Yields its URL."""
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield "http://127.0.0.1:%d" % server.server_port
+    finally:
+        server.shutdown()
+        server.server_close()
+
+class StandInLoop(object):
+    def __init__(self):
+        self.alarms = []
+
+    def set_alarm_in(self, sec, callback, user_data=None):
+        self.alarms.append(callback)
+        return callback
+
+    def fire_alarms(self):
+        alarms, self.alarms = self.alarms, []
+        for callback in alarms:
+            callback(self, None)
@@ -0,0 +1,49 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname( __file__ ), "..", "rebound"))
+import rebound
+from tests.stand_ins import StandInHandler, local_server, serving
+
+# Constants and helper functions
+class KeepAliveSite(StandInHandler):
+    protocol_version = "HTTP/1.1" # Keeps connections open
+    connections = 0
+
+    def setup(self):
+        KeepAliveSite.connections += 1
+        StandInHandler.setup(self)
+
+    def do_HEAD(self):
+        self.send_body(b'')
+
+    def do_GET(self):
+        self.send_body(b"<html></html>")
+
+@pytest.fixture
+def site_url(monkeypatch):
+    monkeypatch.setattr(rebound, "_session", None)
+    KeepAliveSite.connections = 0
+    with serving(local_server(KeepAliveSite, threaded=True)) as site_url: # Kept-alive connections would block a single thread
+        yield site_url
+        rebound.get_session().close()
+
+# Tests
+def test_search_reuses_warmed_up_connection(site_url):
+    rebound.warm_up([site_url])
+    assert KeepAliveSite.connections == 1
+
+    rebound.get_page(site_url + "/search?q=test")
+    assert KeepAliveSite.connections == 1
+
+def test_warm_up_ignores_unreachable_hosts():
+    rebound.warm_up(["http://127.0.0.1:1"], modules=["no_such_module"])
+
+def test_warm_up_urls(monkeypatch):
+    monkeypatch.delenv("REBOUND_CACHE_URL", raising=False)
+    monkeypatch.delenv("REBOUND_BACKEND", raising=False)
+    monkeypatch.setenv("REBOUND_SITES", "stackoverflow,superuser")
+    assert rebound.get_warm_up_urls() == ["https://stackoverflow.com", "https://superuser.com"]
+
+    monkeypatch.setenv("REBOUND_CACHE_URL", "http://cache:8585/")
+    assert rebound.get_warm_up_urls() == ["http://cache:8585"]